@@ -6,17 +6,29 @@ A script to review and clean up Obsidian vault notes using Gemini AI.
 
 import os
 import sys
+import datetime
 import json
+import math
+import hashlib
 import time
 import signal
 import re
 import random
+import urllib.parse
+import threading
+from itertools import islice
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
+import numpy as np
+import orjson
 import google.generativeai as genai
-from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, NotFound
+from google.generativeai import caching
 from colorama import init, Fore, Style
 from tqdm import tqdm
+from send2trash import send2trash
+from send2trash.exceptions import TrashPermissionError
 from count_tokens.count import count_tokens_in_string
 
 # Cross-platform single character input
@@ -46,6 +58,590 @@ except ImportError:
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
+
+# Static scoring rubric for note analysis. It is sent once per session as
+# cached content (or a system instruction) instead of with every request.
+ANALYSIS_RUBRIC = """
+You review notes from an Obsidian vault and assess their relevance compared to the existing vault knowledge.
+
+For each note you receive, please provide:
+1. A relevance score from 0-10 where:
+   - 0-2: Poor quality, redundant with existing notes, or no unique value (should delete)
+   - 3-4: Low value compared to existing knowledge, adds little new information
+   - 5-6: Moderate value, has some unique content but could be improved
+   - 7-8: High value, provides useful information not well covered elsewhere
+   - 9-10: Essential content, unique and valuable knowledge
+
+2. Brief reasoning for the score
+3. Recommendation: "remove" (0-4), "enhance" (5-7), or "keep" (8-10)
+
+IMPORTANT: Base the REMOVE recommendation on whether this note adds value compared to your existing knowledge base. Consider:
+- Does this note contain information already covered better in other notes?
+- Is this note of poor quality compared to similar notes in the vault?
+- Does this note provide unique insights or information not found elsewhere?
+- Would removing this note result in any loss of unique knowledge?
+
+Consider factors like:
+- Content quality and depth
+- Uniqueness of information
+- Practical utility
+- Recency and relevance
+- Whether it's a template, reference, or personal note
+
+**CRITICAL SCORING RULES - PERSONAL KNOWLEDGE IS MOST VALUABLE:**
+
+**MAXIMUM VALUE (+4-5 points each) - Core "Second Brain" Content:**
+- **Personal financial data** (401k, investments, portfolio tracking, bank info, taxes): +5 points (irreplaceable personal records)
+- **Personal medical/health records** (symptoms, treatments, doctor visits, health tracking): +5 points (important health history)
+- **Original thoughts and insights** (personal reflections, unique ideas, "aha moments"): +4 points (irreplaceable creativity)
+- **Personal learning synthesis** (combining multiple sources with your own understanding): +4 points (knowledge building)
+- **Life experiences and stories** (travel, relationships, major events, lessons learned): +4 points (personal history)
+- **API keys, passwords, credentials, secrets** (NOTE FEATURES credentials=yes): +5 points (critical security info)
+
+**HIGH VALUE (+3-4 points each) - Personal Development & Systems:**
+- **Personal project tracking** (goals, habits, progress logs, reviews): +4 points (self-improvement data)
+- **Career development** (job history, performance reviews, salary info, career planning): +4 points (career tracking)
+- **Personal workflows and systems** (custom templates, processes you created): +3 points (reusable personal systems)
+- **Book notes with personal commentary** (highlights + your thoughts and connections): +3 points (learning with insight)
+- **Meeting notes with personal action items** (decisions you made, follow-ups): +3 points (personal responsibility tracking)
+- **Time-series data/tracking** (charts, logs, measurements over time): +3 points (historical value)
+- **Daily notes and journal entries** (personal reflections, mood, daily planning): +3 points (life documentation)
+
+**SOLID VALUE (+2-3 points each) - Knowledge Network & Organization:**
+- **Hub/index notes** (MOCs - Maps of Content, NOTE FEATURES wikilinks 10+): +3 points (central to knowledge network)
+- **Multiple WikiLinks** (NOTE FEATURES wikilinks 3+): +3 points (highly interconnected knowledge)
+- **Tags and metadata** (NOTE FEATURES tags 1+ or frontmatter=yes): +3 points (organized knowledge structure)
+- **Personal contacts/relationships** (addresses, phone numbers, personal notes about people): +3 points (relationship management)
+- **Personal research with insights** (your questions, hypotheses, conclusions): +2 points (original investigation)
+- **Project planning and documentation** (your projects, not work assignments): +2 points (personal organization)
+- **Any WikiLinks** (NOTE FEATURES wikilinks 1-2): +2 points (shows interconnectedness)
+- **Personal definitions and explanations** (your way of understanding complex topics): +2 points (personal knowledge building)
+
+**MINOR VALUE (+1-2 points each) - Supporting Content:**
+- **Learning notes with some personal insight** (courses, tutorials with your notes): +2 points (active learning)
+- **Reference materials you curated** (useful links, resources you collected): +1 point (personal curation)
+- **Templates from others you modified** (adapted to your needs): +1 point (personalization)
+- **Event notes** (conferences, talks you attended with takeaways): +1 point (learning documentation)
+
+**MAJOR PENALTIES (-3-4 points each) - Content That Should Be Removed:**
+- **Copy-pasted content without personal input**: -4 points (not your thoughts, just storage)
+- **Information already covered better in other vault notes**: -4 points (redundant, inferior duplicate)
+- **Easily recreated from Google/Wikipedia**: -4 points (generic information, not personal knowledge)
+- **Temporary/outdated task lists** (completed todos, old project notes): -3 points (served their purpose)
+- **Duplicate information** (same content exists in multiple places): -4 points (knowledge fragmentation, keep the better version)
+- **Empty placeholder notes** (titles with no content, "TODO" notes never filled): -4 points (intellectual debt)
+- **Poor quality compared to similar notes in vault**: -3 points (inferior version of existing knowledge)
+
+**MODERATE PENALTIES (-2-3 points each) - Reduced Value Content:**
+- **No WikiLinks** (NOTE FEATURES wikilinks=0): -3 points (isolated from knowledge network, defeats Obsidian's purpose)
+- **No tags or metadata** (NOTE FEATURES tags=0 and frontmatter=no): -2 points (poor organization, hard to find and categorize)
+- **Outdated technology/software notes** (unless personal setup): -2 points (temporal relevance lost)
+- **Generic templates from internet** (unchanged, not personalized, NOTE FEATURES template placeholders=yes): -2 points (not your system)
+- **Pure link collections** (no commentary, context, or personal organization): -2 points (no added value)
+- **Work-only content** (company-specific info with no personal insight): -2 points (less relevant to personal knowledge)
+
+Each note comes with NOTE FEATURES counted locally from its full content (WikiLinks, tags, frontmatter, credentials, template placeholders). Trust these counts instead of re-counting from the truncated content.
+
+**REMEMBER: Personal = Valuable. WikiLinks/Tags = Essential. Any note containing personal data, tracking, or financial information should score 7+ points. Notes with WikiLinks [[note name]] and tags #tag are the backbone of your knowledge network and should be strongly favored.**
+
+CRITICAL: Respond with ONLY valid JSON in exactly this format (no additional text, no markdown formatting):
+{
+    "score": 7,
+    "reasoning": "Your explanation here",
+    "recommendation": "enhance"
+}
+
+JSON REQUIREMENTS:
+- Use double quotes for all strings
+- Score must be a number 0-10 (no quotes around numbers)
+- Recommendation must be exactly one of: remove, enhance, keep
+- No trailing commas
+- No additional fields or text outside the JSON object
+"""
+
+
+# Structured output schema for note analysis responses
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "score": {"type": "INTEGER"},
+        "reasoning": {"type": "STRING"},
+        "recommendation": {"type": "STRING", "enum": ["remove", "enhance", "keep"]}
+    },
+    "required": ["score", "reasoning", "recommendation"]
+}
+
+# Structured output for analyzing several small notes in one request
+GROUP_ANALYSIS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "index": {"type": "INTEGER"},
+            **ANALYSIS_SCHEMA["properties"]
+        },
+        "required": ["index", "score", "reasoning", "recommendation"]
+    }
+}
+
+# Structured output for atomic concept identification
+ATOMIC_CONCEPTS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "atomic_concepts": {"type": "ARRAY", "items": {"type": "STRING"}}
+    },
+    "required": ["atomic_concepts"]
+}
+
+# Response wrapped in a code fence: captures everything up to the next fence
+CODE_FENCE_PATTERN = re.compile(r'```(?:markdown)?(.*?)(?:```|\Z)', re.DOTALL)
+
+# First JSON object in a response (allows one level of nested braces)
+JSON_OBJECT_PATTERN = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
+# Per-note part of the analysis request, filled in with str.format_map
+ANALYSIS_PROMPT_TEMPLATE = """
+Analyze this Obsidian note and provide a relevance assessment compared to the existing vault knowledge.
+
+File: {name}
+Path: {path}
+
+NOTE FEATURES: wikilinks={wikilinks}, tags={tags}, frontmatter={frontmatter}, credentials={credentials}, template placeholders={template}
+
+{content_label}:
+{content}
+
+{vault_context}
+
+Respond with ONLY the JSON object described in your instructions.
+"""
+
+# Request for several small notes at once; each note is a GROUP_NOTE_SECTION_TEMPLATE
+GROUP_ANALYSIS_PROMPT_TEMPLATE = """
+Analyze each of the following {count} Obsidian notes on its own and provide a relevance assessment for each one compared to the existing vault knowledge.
+
+{notes}
+
+Respond with ONLY a JSON array holding one object per note, in the same order. Each object has "index" (the note number) plus the fields described in your instructions.
+"""
+
+GROUP_NOTE_SECTION_TEMPLATE = """
+### Note {index}
+File: {name}
+Path: {path}
+
+NOTE FEATURES: wikilinks={wikilinks}, tags={tags}, frontmatter={frontmatter}, credentials={credentials}, template placeholders={template}
+
+Content:
+{content}
+
+{vault_context}
+"""
+
+# Prompts for finding and writing atomic notes, filled in with str.format_map
+ATOMIC_CONCEPTS_PROMPT_TEMPLATE = """
+Analyze this note content and identify concepts that should be atomic notes in a second brain/Zettelkasten system.
+
+CURRENT NOTE: {file_name}
+CONTENT TO ANALYZE:
+{content}
+
+FULL VAULT KNOWLEDGE CONTEXT:
+{vault_context}
+
+SMART ATOMIC NOTE IDENTIFICATION:
+Using the full vault context above, identify concepts that:
+1. Are mentioned in this note but don't have dedicated notes yet
+2. Would benefit multiple notes if extracted as atomic concepts  
+3. Represent foundational knowledge that appears across the vault
+4. Fill gaps in the existing knowledge network
+5. Would create valuable connections between existing notes
+
+ATOMIC NOTE PRINCIPLES:
+- Each note should contain ONE concept or idea
+- Notes should be understandable on their own
+- Notes should be linkable and reusable
+- Focus on concepts that appear multiple times or are foundational
+- Avoid duplicating existing notes (check vault context carefully)
+
+IDENTIFY MISSING ATOMIC CONCEPTS:
+1. Scan the vault context to see what concepts already exist
+2. Look for concepts in this note that would benefit the entire vault
+3. Consider concepts that would bridge knowledge gaps
+4. Think about foundational concepts that support multiple areas
+
+Return a JSON list of atomic concept titles that should exist as separate notes:
+{{
+    "atomic_concepts": [
+        "Concept Name 1",
+        "Concept Name 2", 
+        "Concept Name 3"
+    ]
+}}
+
+IMPORTANT:
+- Focus on 2-4 key concepts maximum (quality over quantity)
+- Use clear, descriptive titles (2-4 words)
+- DON'T suggest concepts that already exist in the vault (check the context above)
+- Prioritize concepts that would be useful across multiple existing notes
+- Consider how these concepts would connect to existing notes via [[WikiLinks]]
+"""
+
+ATOMIC_NOTE_PROMPT_TEMPLATE = """
+Create content for a new atomic note in a second brain/Zettelkasten system.
+
+ATOMIC NOTE TITLE: {concept_title}
+
+CONTEXT (from original note):
+{original_content}
+
+ORIGINAL NOTE CONTEXT: {file_context}
+
+FULL VAULT KNOWLEDGE CONTEXT:
+{vault_context}
+
+SMART ATOMIC NOTE CREATION:
+Using the full vault context above, create an atomic note that:
+1. Focuses solely on the concept: {concept_title}
+2. Connects to existing notes in the vault via [[WikiLinks]]
+3. Fills knowledge gaps identified in the vault
+4. Uses terminology consistent with existing notes
+5. References related concepts that already exist
+6. Provides unique value not covered elsewhere
+
+WRITING GUIDELINES:
+- Use conversational but professional tone
+- Use inclusive language with "we," "let's," and "us"
+- Write clearly and concisely without Latin abbreviations
+- Use active voice over passive voice
+- Use globally accessible language, avoid idioms and colloquialisms
+- Do not reference timeframes or external content
+- Do not assume prior knowledge
+- Use precise, consistent terminology
+- Create stand-alone content that does not rely on external materials
+- Write content that is both technically accurate and engaging
+- Use generic references to AI assistants unless specifically needed
+- Use Oxford commas and proper formatting
+- Provide educational and thorough explanations with clear examples
+- Build understanding progressively
+- Use human and concise format
+- Avoid emojis and double dashes
+
+AVOID these complex or abstract terms: 'delve', 'meticulous,' 'navigating,' 'complexities,' 'realm,' 'bespoke,' 'tailored,' 'towards,' 'underpins,' 'ever-changing,' 'ever-evolving,' 'the world of,' 'not only,' 'seeking more than just,' 'designed to enhance,' 'it's not merely,' 'our suite,' 'it is advisable,' 'daunting,' 'in the heart of,' 'when it comes to,' 'in the realm of,' 'amongst,' 'unlock the secrets,' 'unveil the secrets,' 'transforms' and 'robust.'
+
+CREATE ATOMIC NOTE CONTENT:
+- Focus on ONE concept: {concept_title}
+- Make it understandable on its own
+- Include practical information, examples, or definitions
+- Add relevant context for personal knowledge management
+- Use clear structure with headers
+- Aim for 150-400 words (atomic but comprehensive)
+- Include related concepts using [[WikiLinks]] where appropriate
+
+ATOMIC NOTE PRINCIPLES:
+- Autonomy: Should be understandable without other notes
+- Atomicity: Contains only one main idea or concept
+- Linkability: Can be connected to other notes
+- Usefulness: Valuable for future reference
+
+Return ONLY the note content (no JSON, no explanations):
+"""
+
+# Prompt for enhancing a note, filled in with str.format_map
+ENHANCE_NOTE_PROMPT_TEMPLATE = """
+You are enhancing a note in a personal knowledge management system using atomic note principles.
+
+CURRENT NOTE TO ENHANCE:
+File: {file_name}
+===BEGIN ORIGINAL CONTENT===
+{content}
+===END ORIGINAL CONTENT===
+
+FULL VAULT KNOWLEDGE CONTEXT:
+{vault_context}
+
+NEWLY CREATED ATOMIC NOTES (link to these):
+{created_notes}
+
+SMART NOTE ENHANCEMENT:
+Using the full vault context above, enhance this note by:
+1. Adding [[WikiLinks]] to existing notes throughout the content
+2. Connecting this note to the broader knowledge network
+3. Referencing newly created atomic notes where relevant
+4. Identifying knowledge gaps this note fills
+5. Using consistent terminology with existing notes
+6. Creating meaningful connections between concepts
+
+WRITING GUIDELINES:
+- Use conversational but professional tone
+- Use inclusive language with "we," "let's," and "us"
+- Write clearly and concisely without Latin abbreviations
+- Use active voice over passive voice
+- Use globally accessible language, avoid idioms and colloquialisms
+- Do not reference timeframes or external content
+- Do not assume prior knowledge
+- Use precise, consistent terminology
+- Create stand-alone content that does not rely on external materials
+- Write content that is both technically accurate and engaging
+- Use generic references to AI assistants unless specifically needed
+- Use Oxford commas and proper formatting
+- Provide educational and thorough explanations with clear examples
+- Build understanding progressively
+- Use human and concise format
+- Avoid emojis and double dashes
+
+AVOID these complex or abstract terms: 'delve', 'meticulous,' 'navigating,' 'complexities,' 'realm,' 'bespoke,' 'tailored,' 'towards,' 'underpins,' 'ever-changing,' 'ever-evolving,' 'the world of,' 'not only,' 'seeking more than just,' 'designed to enhance,' 'it's not merely,' 'our suite,' 'it is advisable,' 'daunting,' 'in the heart of,' 'when it comes to,' 'in the realm of,' 'amongst,' 'unlock the secrets,' 'unveil the secrets,' 'transforms' and 'robust.'
+
+YOUR TASK:
+Return the enhanced note content with ALL original content preserved exactly as written, plus your enhancements following atomic note principles.
+
+STRICT RULES FOR ENHANCEMENT:
+1. PRESERVE ALL ORIGINAL CONTENT: Keep every character, word, line, and formatting exactly as written above
+2. ONLY ADD NEW CONTENT: You may append or insert additional content, but never modify existing text
+3. NO CORRECTIONS: Do not fix typos, grammar, or formatting in the original content
+4. FOCUSED ENHANCEMENT: Add 1-3 meaningful sections only, avoid repetition
+5. NO DUPLICATE HEADERS: Never repeat the same header or content multiple times
+
+ATOMIC NOTE ENHANCEMENT FOCUS:
+- Link to relevant existing notes using [[WikiLinks]] - this is CRITICAL
+- Reference the newly created atomic notes where relevant
+- Add 1-2 sections maximum that provide value
+- Connect this note to the broader knowledge network
+- Include practical applications or personal insights
+- Use tags (#tag) for categorization
+- Aim for 2-4x the original length (not 10x+)
+- Keep sections focused and non-repetitive
+
+SMART LINKING STRATEGY:
+- Scan the vault context to identify ALL relevant existing notes
+- Use [[Note Name]] for existing notes whenever concepts are mentioned
+- Create natural connections throughout the content, not just at the end
+- Reference newly created atomic notes when discussing their concepts
+- Connect to 5-15 relevant existing notes (be comprehensive)
+- Use the exact note titles from the vault context
+- Create a rich knowledge network with meaningful connections
+- Add a "Related Notes" section if it adds value beyond inline links
+
+CRITICAL OUTPUT REQUIREMENTS:
+- Return ONLY the enhanced note content
+- Include ALL original content exactly as written
+- Do NOT repeat headers or create duplicate sections
+- Do NOT include any instructions, explanations, or commentary
+- Do NOT include any safety requirement text in the output
+- Do NOT include any metadata about the enhancement process
+- MUST include WikiLinks to existing notes - this is essential for knowledge management
+- Keep enhancement focused and concise (2-4x original length maximum)
+
+Begin your response with the enhanced note content now:
+"""
+
+# Smallest system instruction Gemini accepts as cached content; shorter rubrics are sent with each request
+RUBRIC_CACHE_MIN_TOKENS = 32768
+
+# Token budget for the note excerpt sent with each analysis request
+# (about the same as the previous 2000-character cut for English text)
+ANALYSIS_CONTENT_TOKENS = 500
+
+# Generous upper bound on the characters one token covers, used to tokenize only the start of long notes when truncating
+MAX_CHARS_PER_TOKEN = 32
+
+# Score colors and ready-made "score/10" labels, indexed by score 0-10
+SCORE_COLORS = tuple(
+    Fore.RED if score <= 2 else
+    Fore.YELLOW if score <= 4 else
+    Fore.CYAN if score <= 6 else
+    Fore.GREEN if score <= 8 else
+    Fore.LIGHTGREEN_EX
+    for score in range(11)
+)
+SCORE_LABELS = tuple(f"{SCORE_COLORS[score]}{score}/10{Style.RESET_ALL}" for score in range(11))
+
+# Recommendation implied by a score when the response did not state one, indexed by score 0-10
+SCORE_RECOMMENDATIONS = ("remove",) * 5 + ("enhance",) * 3 + ("keep",) * 3
+
+# Review decision menu, prompt and key bindings
+DECISION_MENU = """
+What would you like to do?
+  [k] Keep this file (default)
+  [d] Delete this file
+  [v] View entire note content
+  [e] Enhance/Expand this note with AI
+  [s] Skip for now
+  [q] Quit the review process
+"""
+DECISION_PROMPT = "\nPress a key (k/d/v/s/e/q, ? for menu) or Enter for default (keep): "
+DECISION_KEYS = {
+    'k': 'keep',
+    'd': 'delete',
+    'v': 'view',
+    'e': 'enhance',
+    's': 'skip',
+    'q': 'quit'
+}
+
+# An enhanced note within these length ratios of the original and with the same opening
+# characters keeps its analysis instead of being sent for re-analysis
+MINOR_ENHANCEMENT_MIN_RATIO = 0.9
+MINOR_ENHANCEMENT_MAX_RATIO = 1.1
+MINOR_ENHANCEMENT_PREFIX_CHARS = 512
+
+# ANSI codes added by inline formatting, and their lengths (for measuring formatted table cells)
+ITALIC_ON = '\033[3m'
+ITALIC_OFF = '\033[0m'
+INLINE_STYLE_CODES = tuple((code, len(code)) for code in (Style.BRIGHT, Style.NORMAL, ITALIC_ON, ITALIC_OFF))
+
+# Preview line kind suggested by a line's first character; other lines are text (or a table row or numbered item)
+PREVIEW_LINE_STARTS = {'#': 'header', '-': 'list', '*': 'list', '+': 'list', '`': 'code', **dict.fromkeys('0123456789', 'numbered')}
+
+# Final decisions made by check_auto_decision, and the messages shown when keeping or skipping a note
+AUTO_DECISIONS = {"auto_keep": "keep", "auto_delete": "delete"}
+DECISION_MESSAGES = {"keep": "kept", "skip": "skipped"}
+
+# Recommendation display styles
+RECOMMENDATION_STYLES = {
+    'remove': ("🗑️", Fore.RED),
+    'enhance': ("✨", Fore.YELLOW),
+    'keep': ("✅", Fore.GREEN)
+}
+SEPARATOR_LINE = "\n" + "="*80
+
+# Progress log records appended between full rewrites of the progress file
+PROGRESS_LOG_COMPACT_RECORDS = 200
+
+# Note features extracted locally instead of asking the model to find them
+WIKILINK_PATTERN = re.compile(r'\[\[([^\]]+)\]\]')
+TAG_PATTERN = re.compile(r'(?:^|\s)#([A-Za-z][\w/-]*)')
+# A credential keyword only counts with a secret-looking value after it, so prose and code like "token = lexer.next()" do not
+SECRET_PATTERN = re.compile(
+    r'''(?i)(?:(?:api[_-]?key|password|passwd|token|secret)["']?\s*[:=]|bearer)\s*["']?[A-Za-z0-9_\-/+=]{16,}'''
+)
+TEMPLATE_PATTERN = re.compile(r'\{\{[^}]+\}\}|<%[^%]*%>')
+
+# Elements an enhanced note must keep from the original, and the punctuation ignored when matching lines
+PRESERVED_TAG_PATTERN = re.compile(r'#(\w+)')
+IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\([^)]+\)')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Characters that are not allowed in note file names
+UNSAFE_FILENAME_PATTERN = re.compile(r'[<>:"/\\|?*]')
+
+# Section markers such as ===ENHANCED NOTE=== and bare === lines left in enhanced notes
+SECTION_MARKER_PATTERN = re.compile(r'={3,}[A-Z\s]+={3,}')
+MARKER_LINE_PATTERN = re.compile(r'^={3,}$', re.MULTILINE)
+
+# Repairs for malformed JSON: unquoted keys, single-quoted strings, trailing commas
+UNQUOTED_KEY_PATTERN = re.compile(r'(\w+):')
+SINGLE_QUOTED_PATTERN = re.compile(r"'([^']*)'")
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+
+# Last-resort score and reasoning extraction, tried in order
+FALLBACK_SCORE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'"score":\s*(\d+)',
+    r'"score":\s*"(\d+)"',
+    r'score:\s*(\d+)',
+    r'Score:\s*(\d+)',
+    r'relevance score.*?(\d+)',
+    r'(\d+)/10',
+    r'score.*?(\d+)'
+))
+FALLBACK_REASONING_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+    r'"reasoning":\s*"([^"]+)"',
+    r'"reasoning":\s*([^,}]+)',
+    r'reasoning:\s*([^,}]+)',
+    r'Reasoning:\s*([^,}]+)',
+    r'because\s+([^.]+)',
+    r'This\s+([^.]+\.)'
+))
+
+# YAML frontmatter block at the top of a note
+FRONTMATTER_PATTERN = re.compile(r'\A---[ \t]*\n.*?\n---[ \t]*(?:\n|\Z)', re.DOTALL)
+
+# Body made of nothing but markdown headings (an outline that was never filled in)
+HEADINGS_ONLY_PATTERN = re.compile(r'(?:#{1,6}[ \t][^\n]*(?:\n|\Z)|\s)*')
+
+# Run of non-whitespace characters, for counting a note's body text word by word
+NON_WHITESPACE_PATTERN = re.compile(r'\S+')
+
+# Content that makes a short note worth a real AI review (links, tags, URLs, credentials)
+TRIVIAL_NOTE_EXCEPTIONS_PATTERN = re.compile(
+    r'\[\[|(?:^|\s)#\w|https?://|api[_-]?key|password|passwd|token|secret|bearer',
+    re.IGNORECASE
+)
+
+
+class AnalysisCancelled(Exception):
+    """Raised in background workers once the review has stopped."""
+
+
+# Adaptive request rate: the share of requests_per_minute used after a 429 is halved
+# down to this floor, then recovered by the step below with each successful request
+RATE_FACTOR_MIN = 0.1
+RATE_FACTOR_RECOVERY_STEP = 0.05
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for API requests.
+    Tracks requests and prompt tokens per minute separately and blocks only
+    when either budget is exhausted. The request rate adapts to the API: it is
+    halved after a 429 and recovers gradually as requests succeed.
+    Safe to share between threads.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = max(1, requests_per_minute)
+        self.tokens_per_minute = max(1, tokens_per_minute)
+        self.available_requests = float(self.requests_per_minute)
+        self.available_tokens = float(self.tokens_per_minute)
+        self.last_refill = time.monotonic()
+        self.rate_factor = 1.0  # Share of requests_per_minute currently allowed
+        self.lock = threading.Lock()
+        
+    def refill(self):
+        """Add back the budget earned since the last refill (caller holds the lock)."""
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.available_requests = min(self.requests_per_minute, self.available_requests + elapsed * self.requests_per_minute * self.rate_factor / 60)
+        self.available_tokens = min(self.tokens_per_minute, self.available_tokens + elapsed * self.tokens_per_minute / 60)
+        
+    def drain(self):
+        """Empty the request budget and halve the request rate after a 429, so every thread slows down, not just the one that was rejected."""
+        with self.lock:
+            self.refill()
+            self.available_requests = 0.0
+            self.rate_factor = max(RATE_FACTOR_MIN, self.rate_factor / 2)
+            
+    def record_success(self):
+        """Recover some of the request rate given up after earlier 429s."""
+        if self.rate_factor < 1.0:
+            with self.lock:
+                self.refill()
+                self.rate_factor = min(1.0, self.rate_factor + RATE_FACTOR_RECOVERY_STEP)
+            
+    def acquire(self, tokens: int = 0, cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        Block until one request and the estimated number of tokens are available, then consume them.
+        Returns False without consuming anything if cancel_event is set while waiting.
+        """
+        tokens = min(max(0, tokens), self.tokens_per_minute)
+        while True:
+            with self.lock:
+                self.refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return True
+                # Time until both budgets have refilled enough
+                request_wait = (1 - self.available_requests) * 60 / (self.requests_per_minute * self.rate_factor)
+                token_wait = (tokens - self.available_tokens) * 60 / self.tokens_per_minute
+                wait = max(request_wait, token_wait, 0.01)
+            if cancel_event is None:
+                time.sleep(wait)
+            elif cancel_event.wait(wait):
+                return False
+
+
 class ObsidianVaultReviewer:
     def __init__(self, api_key: str, vault_path: str):
         """Initialize the reviewer with Gemini API key and vault path."""
@@ -59,7 +655,11 @@ class ObsidianVaultReviewer:
         self.atomic_notes_created = []  # Track atomic notes created during enhancement
         self.atomic_notes_reviewed = []  # Track atomic notes that were also reviewed in same session
         self.progress_file = self.vault_path / ".obsidian_review_progress.json"
-        self.processed_files = set()  # Track which files have been processed
+        self.progress_log_file = self.progress_file.with_suffix('.log')  # Decisions appended since the last full save
+        self.last_saved_counts = None  # Decision counts at the last progress save, to skip unchanged rewrites
+        self.progress_log_records = 0  # Records in the progress log since it was last compacted
+        self.saving_progress = False  # Set while a progress write is in flight, so Ctrl-C can rewrite instead of append
+        self.processed_files = {}  # Vault-relative paths of processed files, with their size/mtime/hash when reviewed
         self.original_session_start = time.strftime("%Y-%m-%d %H:%M:%S")  # Track session start time
         self.setup_signal_handlers()  # Handle Ctrl-C gracefully
         
@@ -70,11 +670,75 @@ class ObsidianVaultReviewer:
         self.config_file = Path.home() / ".obsidian_vault_reviewer_settings.json"
         self.config = self.load_config()
         
+        # Shared request/token budget for every API call
+        self.rate_limiter = RateLimiter(
+            self.config.get("requests_per_minute", 15),
+            self.config.get("tokens_per_minute", 1000000)
+        )
+        
+        # Set when the review stops so background API calls give up instead of waiting out backoff
+        self.stop_event = threading.Event()
+        
+        # Exact analysis cache keyed on the SHA-256 of note content, shared across sessions
+        self.analysis_cache_file = self.vault_path / ".vault_review_cache.json"
+        self.analysis_cache = {}
+        self.analysis_cache_unsaved = 0
+        self.analysis_cache_lock = threading.Lock()
+        self.analyses_in_flight = {}  # content hash -> Event set when that analysis finishes
+        self.load_analysis_cache()
+        
+        # Unedited copies of template notes are scored locally
+        self.template_hashes = {}  # content hash -> template name
+        self.templates_path = None
+        
+        # Semantic cache of previous analyses keyed on content embeddings
+        self.semantic_cache_file = self.vault_path / ".vault_review_cache.npz"
+        self.semantic_embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.semantic_analyses = []
+        self.semantic_lock = threading.Lock()
+        self.precomputed_embeddings = {}  # hash of the embedded text -> unit vector from a batched request
+        self.load_semantic_cache()
+        
+        # Vault-relative paths, computed once per file
+        self.vault_prefix = os.path.join(str(self.vault_path), '')
+        self.relative_paths = {}
+        self.clickable_paths = {}  # Obsidian hyperlink escape sequence per file
+        self.formatted_content_cache = (None, "")  # (content, formatted text) of the last full-content view
+        self.preview_cache = (None, 0, "")  # (content, max_length, preview) of the last preview
+        self.note_labels_cache = (None, None, None)  # (path, content, labels) of the last note displayed
+        self.obsidian_url_prefix = f"obsidian://open?vault={urllib.parse.quote(self.vault_path.name, safe='')}&file="
+        
+        # Background file reads for upcoming notes in the review queue
+        self.read_executor = None
+        self.content_futures = {}
+        self.file_signatures = {}  # processed-file signatures hashed during those reads
+        self.prefetch_window = 64
+        
+        # Analyses running ahead of the user while they review the current note
+        self.analysis_executor = None
+        self.analysis_futures = {}
+        
+        # Groups of near-duplicate notes: file path -> cluster id, and the analysis shared by each cluster
+        self.duplicate_clusters = {}
+        self.duplicate_cluster_sizes = {}
+        self.duplicate_siblings = set()
+        self.cluster_analyses = {}
+        self.identical_copies = {}  # file path -> number of other pending notes with exactly the same content
+        self.note_content_hashes = {}  # file path -> content hash, taken while the vault knowledge is loaded
+        
+        # The full decision menu is printed only the first time
+        self.decision_menu_shown = False
+        
+        # Deletions run in the background so slow (e.g. network) vaults don't stall the review
+        self.delete_executor = None
+        self.failed_deletes = []
+        
         # Vault knowledge base cache
         self.vault_knowledge = {}  # Will store all note contents
         self.vault_knowledge_summary = ""  # Summary if full content is too large
         self.token_limit = 1000000  # Gemini 2.0 Flash has 1M token context window
         self.knowledge_loaded = False
+        self.title_index = None  # (titles, title word -> positions, any full content), built on first use
         
         # Initialize count-tokens for accurate token counting
         try:
@@ -88,17 +752,142 @@ class ObsidianVaultReviewer:
         
     def setup_gemini(self):
         """Configure Gemini API."""
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        # gRPC keeps one HTTP/2 channel per service open for the whole session, and the
+        # concurrent analysis threads multiplex their requests over it
+        genai.configure(api_key=self.api_key, transport="grpc")
+        self.model_name = 'gemini-2.0-flash-exp'
+        self.model = genai.GenerativeModel(self.model_name)
+        threading.Thread(target=self.warm_up_connection, daemon=True).start()
+        self.atomic_concepts_config = genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=ATOMIC_CONCEPTS_SCHEMA
+        )
+        # Held while the rubric cache is replaced, so analysis workers never rebuild it twice
+        self.rubric_cache_lock = threading.RLock()
+        self.rubric_cache = None
+        self.setup_analysis_model()
+        
+    def warm_up_connection(self):
+        """
+        Open the generation channel (TCP and TLS handshakes) with a free token-count
+        request while the vault loads, so the first analysis doesn't pay for it.
+        """
+        try:
+            self.model.count_tokens("warm up")
+        except Exception:
+            pass
+            
+    def setup_analysis_model(self, vault_overview: str = ""):
+        """
+        Build the model used for note analysis with the scoring rubric attached.
+        The rubric (plus the vault overview, once known) is stored with Gemini
+        context caching so each request only carries the per-note part of the
+        prompt, once it reaches the cache's minimum size. Smaller rubrics, and
+        models without caching support, get it as a system instruction instead. Responses are constrained to ANALYSIS_SCHEMA so they arrive as
+        plain JSON.
+        """
+        with self.rubric_cache_lock:
+            self.analysis_vault_overview = vault_overview
+            system_instruction = ANALYSIS_RUBRIC
+            if vault_overview:
+                system_instruction += f"\n\nVAULT OVERVIEW (applies to every note):\n{vault_overview}"
+                
+            # Drop the previous cache rather than leaving it to expire
+            self.delete_rubric_cache()
+            self.build_analysis_models(system_instruction)
+            
+    def build_analysis_models(self, system_instruction: str):
+        """Create the rubric cache and the single-note and group analysis models that use it."""
+        generation_config = genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=ANALYSIS_SCHEMA
+        )
+        group_generation_config = genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=GROUP_ANALYSIS_SCHEMA
+        )
+        if self.meets_cache_minimum(system_instruction):
+            try:
+                self.rubric_cache = caching.CachedContent.create(
+                    model=f"models/{self.model_name}",
+                    display_name="obsidian-vault-reviewer-rubric",
+                    system_instruction=system_instruction,
+                    ttl=datetime.timedelta(hours=2)
+                )
+                self.analysis_model = genai.GenerativeModel.from_cached_content(
+                    cached_content=self.rubric_cache,
+                    generation_config=generation_config
+                )
+                self.group_analysis_model = genai.GenerativeModel.from_cached_content(
+                    cached_content=self.rubric_cache,
+                    generation_config=group_generation_config
+                )
+                return
+            except Exception:
+                self.delete_rubric_cache()
+        self.analysis_model = genai.GenerativeModel(
+            self.model_name,
+            system_instruction=system_instruction,
+            generation_config=generation_config
+        )
+        self.group_analysis_model = genai.GenerativeModel(
+            self.model_name,
+            system_instruction=system_instruction,
+            generation_config=group_generation_config
+        )
+        
+    def meets_cache_minimum(self, system_instruction: str) -> bool:
+        """
+        Whether the system instruction is large enough for Gemini context caching.
+        A token spans at least one UTF-8 byte, so short text is rejected without a
+        count_tokens request; only text that might qualify is counted by the API.
+        """
+        if len(system_instruction.encode('utf-8')) < RUBRIC_CACHE_MIN_TOKENS:
+            return False
+        try:
+            return self.model.count_tokens(system_instruction).total_tokens >= RUBRIC_CACHE_MIN_TOKENS
+        except Exception:
+            return False
+            
+    def delete_rubric_cache(self):
+        """Delete the rubric cache now instead of paying for it until its TTL runs out."""
+        with self.rubric_cache_lock:
+            if self.rubric_cache is not None:
+                try:
+                    self.rubric_cache.delete()
+                except Exception:
+                    pass
+                self.rubric_cache = None
+                
+    def generate_analysis(self, prompt: str, group: bool = False):
+        """Run an analysis prompt (a group prompt if group is set), recreating the rubric cache if it has expired."""
+        with self.rubric_cache_lock:
+            rubric_cache = self.rubric_cache
+            model = self.group_analysis_model if group else self.analysis_model
+        try:
+            return self.handle_rate_limiting(model.generate_content, prompt)
+        except NotFound:
+            if rubric_cache is None:
+                raise
+            with self.rubric_cache_lock:
+                # Only the first worker to see the expired cache recreates it; the others reuse its new models
+                if self.rubric_cache is rubric_cache:
+                    if self.stop_event.is_set():
+                        raise AnalysisCancelled()
+                    tqdm.write("🔄 Rubric cache expired, recreating...")
+                    self.setup_analysis_model(self.analysis_vault_overview)
+                model = self.group_analysis_model if group else self.analysis_model
+            return self.handle_rate_limiting(model.generate_content, prompt)
         
     def setup_signal_handlers(self):
         """Set up signal handlers to save progress on interruption."""
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
         
-    def is_file_size_acceptable(self, file_path: Path) -> tuple[bool, int]:
+    def is_file_size_acceptable(self, file_path) -> tuple[bool, int]:
         """
         Check if file size is within acceptable limits.
+        Accepts a Path or an os.DirEntry (whose stat() is cached).
         Returns (is_acceptable, size_in_kb)
         """
         try:
@@ -128,12 +917,21 @@ class ObsidianVaultReviewer:
         """
         last_exception = None
         
+        # Rough prompt size for the token budget (about 4 characters per token)
+        estimated_tokens = len(args[0]) // 4 if args and isinstance(args[0], str) else 0
+        
         for attempt in range(max_retries + 1):
+            if not self.rate_limiter.acquire(estimated_tokens, self.stop_event):
+                raise AnalysisCancelled()
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
+                self.rate_limiter.record_success()
+                return result
                 
             except (ResourceExhausted, ServiceUnavailable) as e:
                 last_exception = e
+                if isinstance(e, ResourceExhausted):
+                    self.rate_limiter.drain()
                 
                 if attempt == max_retries:
                     tqdm.write(f"❌ API rate limiting: All {max_retries} retries exhausted")
@@ -146,7 +944,8 @@ class ObsidianVaultReviewer:
                 delay = min(delay, 60)
                 
                 tqdm.write(f"⏳ API rate limited. Waiting {delay:.1f}s before retry {attempt + 1}/{max_retries}...")
-                time.sleep(delay)
+                if self.stop_event.wait(delay):
+                    raise AnalysisCancelled()
                 
             except Exception as e:
                 # For non-rate-limiting errors, don't retry
@@ -159,13 +958,19 @@ class ObsidianVaultReviewer:
         
     def clear_screen(self):
         """Clear the terminal screen (cross-platform)."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Output going to a file or pipe has no screen to clear
+        if not sys.stdout.isatty():
+            return
+        # Home the cursor and erase the screen and scrollback with ANSI codes instead of
+        # spawning a shell; colorama translates them on Windows consoles
+        sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+        sys.stdout.flush()
         
     def soft_clear_for_tqdm(self, keep_lines=3):
         """Clear screen while preserving tqdm progress bar."""
-        # Instead of clearing entire screen, just add some space
-        for _ in range(keep_lines):
-            tqdm.write("")
+        # Instead of clearing entire screen, just add some space (in one write, since tqdm.write ends with a newline)
+        if keep_lines > 0:
+            tqdm.write("\n" * (keep_lines - 1))
             
     def pause_progress_bar(self, progress_bar):
         """Temporarily pause the progress bar for clean user input."""
@@ -193,9 +998,9 @@ class ObsidianVaultReviewer:
         else:
             prompt_text = f"{prompt} (y/n): "
             
+        sys.stdout.write(prompt_text)
+        sys.stdout.flush()
         while True:
-            print(prompt_text, end="", flush=True)
-            
             try:
                 choice = getch()
                 
@@ -210,10 +1015,13 @@ class ObsidianVaultReviewer:
                     print("n")  
                     return False
                 else:
+                    # The error and the repeated prompt go out in one write
                     if default:
-                        print(f"{choice} - Invalid choice. Please press 'y' for yes, 'n' for no, or Enter for default ({default}).")
+                        hint = f"Please press 'y' for yes, 'n' for no, or Enter for default ({default})."
                     else:
-                        print(f"{choice} - Invalid choice. Please press 'y' for yes or 'n' for no.")
+                        hint = "Please press 'y' for yes or 'n' for no."
+                    sys.stdout.write(f"{choice} - Invalid choice. {hint}\n{prompt_text}")
+                    sys.stdout.flush()
             except (KeyboardInterrupt, EOFError):
                 print("\nExiting...")
                 sys.exit(0)
@@ -289,6 +1097,22 @@ class ObsidianVaultReviewer:
         include_subfolders = self.get_yes_no_input(f"Include subfolders when scanning? (currently: {'YES' if self.config['include_subfolders'] else 'NO'})")
         self.config["include_subfolders"] = include_subfolders
         
+        # Batch analysis option
+        batch_analysis = self.get_yes_no_input(f"Analyze all notes in a background batch during the review? (currently: {'YES' if self.config['batch_analysis_enabled'] else 'NO'})")
+        self.config["batch_analysis_enabled"] = batch_analysis
+        
+        # Semantic cache option
+        semantic_cache = self.get_yes_no_input(f"Reuse analyses of near-duplicate notes (semantic cache)? (currently: {'YES' if self.config['semantic_cache_enabled'] else 'NO'})")
+        self.config["semantic_cache_enabled"] = semantic_cache
+        
+        # Near-duplicate clustering option
+        duplicate_clustering = self.get_yes_no_input(f"Group near-duplicate notes and analyze each group once? (currently: {'YES' if self.config['duplicate_clustering_enabled'] else 'NO'})")
+        self.config["duplicate_clustering_enabled"] = duplicate_clustering
+        
+        # Trash option
+        move_to_trash = self.get_yes_no_input(f"Move deleted notes to the system trash instead of removing them? (currently: {'YES' if self.config['move_to_trash'] else 'NO'})")
+        self.config["move_to_trash"] = move_to_trash
+        
         # Save configuration to file
         self.save_config()
         
@@ -301,9 +1125,18 @@ class ObsidianVaultReviewer:
         print(f"   File size limit: {self.config['max_file_size_kb']}KB maximum")
         print(f"   Show skipped files: {'Enabled' if self.config['show_skipped_files'] else 'Disabled'}")
         print(f"   Subfolders: {'Included' if self.config['include_subfolders'] else 'Root only'}")
+        print(f"   Batch analysis: {'Enabled' if self.config['batch_analysis_enabled'] else 'Disabled'}")
+        print(f"   Semantic cache: {'Enabled' if self.config['semantic_cache_enabled'] else 'Disabled'}")
+        print(f"   Near-duplicate clustering: {'Enabled' if self.config['duplicate_clustering_enabled'] else 'Disabled'}")
+        print(f"   Deleted notes: {'Moved to trash' if self.config['move_to_trash'] else 'Removed permanently'}")
         print(f"   Settings saved to: {self.config_file}")
         print("")
         
+    def is_fully_automatic(self) -> bool:
+        """True when auto-keep and auto-delete together cover every score, so no note waits for the user."""
+        return (self.config["auto_keep_enabled"] and self.config["auto_delete_enabled"]
+                and self.config["auto_keep_threshold"] <= self.config["auto_delete_threshold"] + 1)
+        
     def check_auto_decision(self, file_path: Path, analysis: Dict) -> Optional[str]:
         """Check if an auto-decision should be made based on score and configuration."""
         score = analysis['score']
@@ -312,18 +1145,22 @@ class ObsidianVaultReviewer:
         if (self.config["auto_keep_enabled"] and 
             score >= self.config["auto_keep_threshold"]):
             if self.config["show_auto_decisions"]:
-                tqdm.write(f"\n🤖 AUTO-KEEP: Score {score}/{self.config['auto_keep_threshold']}+ → {Fore.GREEN}Automatically kept{Style.RESET_ALL}")
-                tqdm.write(f"📄 {file_path.name}")
-                tqdm.write(f"💡 {analysis['reasoning'][:100]}...")
+                tqdm.write(
+                    f"\n🤖 AUTO-KEEP: Score {score}/{self.config['auto_keep_threshold']}+ → {Fore.GREEN}Automatically kept{Style.RESET_ALL}\n"
+                    f"📄 {file_path.name}\n"
+                    f"💡 {analysis['reasoning'][:100]}..."
+                )
             return "auto_keep"
             
         # Auto-delete check  
         if (self.config["auto_delete_enabled"] and 
             score <= self.config["auto_delete_threshold"]):
             if self.config["show_auto_decisions"]:
-                tqdm.write(f"\n🤖 AUTO-DELETE: Score {score}/{self.config['auto_delete_threshold']}- → {Fore.RED}Automatically deleted{Style.RESET_ALL}")
-                tqdm.write(f"📄 {file_path.name}")
-                tqdm.write(f"💡 {analysis['reasoning'][:100]}...")
+                tqdm.write(
+                    f"\n🤖 AUTO-DELETE: Score {score}/{self.config['auto_delete_threshold']}- → {Fore.RED}Automatically deleted{Style.RESET_ALL}\n"
+                    f"📄 {file_path.name}\n"
+                    f"💡 {analysis['reasoning'][:100]}..."
+                )
             return "auto_delete"
             
         return None
@@ -342,6 +1179,30 @@ class ObsidianVaultReviewer:
         except Exception as e:
             # Fallback to character-based estimation
             return len(text) // 4
+            
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Cut text to at most max_tokens tokens. Unlike a character slice this
+        keeps the prompt size steady for CJK, math or emoji-heavy notes.
+        """
+        # The cut of a long note almost always falls within its first few thousand characters,
+        # so count that prefix instead of tokenizing the whole note on every step
+        high = len(text)
+        window = max_tokens * MAX_CHARS_PER_TOKEN
+        if high > window and self.estimate_token_count(text[:window]) > max_tokens:
+            high = window
+        elif self.estimate_token_count(text) <= max_tokens:
+            return text
+            
+        # Binary search for the longest prefix that fits the budget
+        low = 0
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.estimate_token_count(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
         
     def load_vault_knowledge(self):
         """
@@ -357,30 +1218,19 @@ class ObsidianVaultReviewer:
             # Find all markdown files (.md extension only)
             # Respect subfolder configuration
             if self.config.get("include_subfolders", True):
-                md_files = list(self.vault_path.rglob("*.md"))
+                entries = list(self.scan_markdown_entries(self.vault_path, recursive=True))
                 scan_type = "recursively (including subfolders)"
             else:
-                md_files = list(self.vault_path.glob("*.md"))
+                entries = list(self.scan_markdown_entries(self.vault_path, recursive=False))
                 scan_type = "in root directory only"
                 
-            print(f"Found {len(md_files)} markdown files (.md) - scanning {scan_type}")
-            
-            # Filter out any non-markdown files that might have slipped through
-            md_files = [f for f in md_files if f.suffix.lower() == '.md']
+            print(f"Found {len(entries)} markdown files (.md) - scanning {scan_type}")
             
             # Filter by file size
-            acceptable_files = []
-            skipped_files = []
+            acceptable_files, skipped_files = self.split_by_size(entries)
             max_size_kb = self.config.get("max_file_size_kb", 30)
             
-            for file_path in md_files:
-                is_acceptable, size_kb = self.is_file_size_acceptable(file_path)
-                if is_acceptable:
-                    acceptable_files.append(file_path)
-                else:
-                    skipped_files.append((file_path, size_kb))
-            
-            md_files = acceptable_files
+            md_files = [file_path for file_path, _ in acceptable_files]
             total_files = len(md_files)
             total_chars = 0
             loaded_count = 0
@@ -399,15 +1249,15 @@ class ObsidianVaultReviewer:
             
             # First pass: calculate total size and tokens
             print(f"Scanning {total_files} markdown files...")
-            all_content = []
-            for file_path in tqdm(md_files, desc="Calculating vault size"):
-                try:
-                    content = self.read_file_content(file_path)
-                    if content.strip():  # Only count non-empty markdown files
-                        total_chars += len(content)
-                        all_content.append(content)
-                except:
-                    pass
+            # Keep what we read so the loading pass below doesn't read every file again
+            note_contents = {}
+            for file_path, content in tqdm(self.read_many(md_files), total=len(md_files), desc="Calculating vault size"):
+                if content.strip():  # Only count non-empty markdown files
+                    total_chars += len(content)
+                    note_contents[file_path] = content
+                    # Hashed now so exact copies can be found later without reading the vault again
+                    self.note_content_hashes[str(file_path)] = self.content_hash(content)
+            all_content = list(note_contents.values())
                     
             # Test count-tokens with a small sample first
             test_text = "This is a test sentence to verify count-tokens is working correctly."
@@ -470,19 +1320,14 @@ class ObsidianVaultReviewer:
                 # Load full content
                 print("\n✅ Loading full vault content (within token limits)...")
                 
-                for file_path in tqdm(md_files, desc="Loading markdown notes"):
-                    try:
-                        content = self.read_file_content(file_path)
-                        if content.strip():  # Only store non-empty markdown notes
-                            note_title = file_path.stem
-                            self.vault_knowledge[note_title] = {
-                                'path': str(file_path.relative_to(self.vault_path)),
-                                'content': content,
-                                'length': len(content)
-                            }
-                            loaded_count += 1
-                    except Exception as e:
-                        pass
+                for file_path, content in tqdm(note_contents.items(), desc="Loading markdown notes"):
+                    note_title = file_path.stem
+                    self.vault_knowledge[note_title] = {
+                        'path': self.get_relative_path(file_path),
+                        'content': content,
+                        'length': len(content)
+                    }
+                    loaded_count += 1
                         
                 print(f"✅ Loaded {loaded_count} markdown notes into memory")
                 self.knowledge_loaded = True
@@ -492,21 +1337,16 @@ class ObsidianVaultReviewer:
                 print(f"\n⚠️ Vault too large for full content ({estimated_tokens:,} tokens > {int(self.token_limit * 0.8):,} limit). Creating summaries...")
                 
                 # Load titles and brief excerpts from markdown files
-                for file_path in tqdm(md_files, desc="Creating markdown summaries"):
-                    try:
-                        content = self.read_file_content(file_path)
-                        if content.strip():
-                            note_title = file_path.stem
-                            # Store title, path, and first 500 chars
-                            self.vault_knowledge[note_title] = {
-                                'path': str(file_path.relative_to(self.vault_path)),
-                                'excerpt': content[:500] + "..." if len(content) > 500 else content,
-                                'length': len(content),
-                                'full_content': False
-                            }
-                            loaded_count += 1
-                    except:
-                        pass
+                for file_path, content in tqdm(note_contents.items(), desc="Creating markdown summaries"):
+                    note_title = file_path.stem
+                    # Store title, path, and first 500 chars
+                    self.vault_knowledge[note_title] = {
+                        'path': self.get_relative_path(file_path),
+                        'excerpt': content[:500] + "..." if len(content) > 500 else content,
+                        'length': len(content),
+                        'full_content': False
+                    }
+                    loaded_count += 1
                         
                 print(f"✅ Created summaries for {loaded_count} markdown notes")
                 self.knowledge_loaded = True
@@ -514,6 +1354,10 @@ class ObsidianVaultReviewer:
                 # Create a high-level vault summary
                 self.create_vault_summary()
                 
+                # The summary is the same for every note, so send it once with the cached rubric
+                if self.vault_knowledge_summary:
+                    self.setup_analysis_model(self.vault_knowledge_summary)
+                
         except Exception as e:
             print(f"❌ Error loading vault knowledge: {e}")
             print("Continuing without full vault context...")
@@ -672,6 +1516,23 @@ class ObsidianVaultReviewer:
             
         return final_categories
 
+    def get_title_index(self) -> tuple[List[str], Dict[str, List[int]], bool]:
+        """
+        Index vault note titles by their lowercase words so related notes are found
+        without splitting every title for every analyzed note. Rebuilt if the vault
+        knowledge changes size.
+        """
+        index = self.title_index
+        if index is None or len(index[0]) != len(self.vault_knowledge):
+            titles = list(self.vault_knowledge)
+            word_positions = {}
+            for position, title in enumerate(titles):
+                for word in set(title.lower().split()):
+                    word_positions.setdefault(word, []).append(position)
+            has_content = any(info.get('content') for info in self.vault_knowledge.values())
+            index = self.title_index = (titles, word_positions, has_content)
+        return index
+        
     def get_vault_context_for_analysis(self, current_file: Path) -> str:
         """
         Get relevant vault context for analyzing a specific note.
@@ -682,20 +1543,19 @@ class ObsidianVaultReviewer:
             
         context_parts = []
         
+        titles, word_positions, has_content = self.get_title_index()
+        
         # If we have full content loaded
-        if any(info.get('content') for info in self.vault_knowledge.values()):
-            # Find related notes (simple keyword matching)
+        if has_content:
+            # Find related notes (simple keyword matching on title words, in vault order)
             current_title = current_file.stem
-            current_words = set(current_title.lower().split())
-            
-            related_notes = []
-            for title, info in self.vault_knowledge.items():
-                if title == current_title:
-                    continue
-                    
-                title_words = set(title.lower().split())
-                if current_words & title_words:  # Common words
-                    related_notes.append((title, info))
+            positions = set()
+            for word in set(current_title.lower().split()):
+                positions.update(word_positions.get(word, ()))
+            related_notes = [
+                (titles[position], self.vault_knowledge[titles[position]])
+                for position in sorted(positions) if titles[position] != current_title
+            ]
                     
             # Add up to 10 most relevant notes
             if related_notes:
@@ -710,8 +1570,8 @@ class ObsidianVaultReviewer:
             # Also add vault overview for context
             context_parts.append(f"\nVAULT OVERVIEW: {len(self.vault_knowledge)} total notes")
                 
-        else:
-            # Use summary for large vaults
+        elif not self.analysis_vault_overview:
+            # Use summary for large vaults (unless it is already in the cached instructions)
             context_parts.append("VAULT OVERVIEW:")
             context_parts.append(self.vault_knowledge_summary)
             
@@ -733,31 +1593,27 @@ class ObsidianVaultReviewer:
                 
             # Otherwise, do a quick scan
             # Find all markdown files in the vault (.md extension only)
-            md_files = list(self.vault_path.rglob("*.md"))
-            md_files = [f for f in md_files if f.suffix.lower() == '.md']  # Ensure only .md files
+            entries = self.scan_markdown_entries(self.vault_path, recursive=True)
             
             # Filter by file size
-            md_files = [f for f in md_files if self.is_file_size_acceptable(f)[0]]
-            
-            for file_path in md_files:
-                # Use the filename without extension as the note title
-                note_title = file_path.stem
-                # Store the relative path from vault root
-                relative_path = file_path.relative_to(self.vault_path)
-                existing_notes[note_title] = str(relative_path)
-                
-                # Also read the first line to check for alternate titles (like # Header)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        first_line = f.readline().strip()
-                        if first_line.startswith('#'):
-                            # Extract header text as alternate title
-                            header_title = first_line.lstrip('#').strip()
-                            if header_title and header_title != note_title:
-                                existing_notes[header_title] = str(relative_path)
-                except Exception:
-                    # If we can't read the file, skip alternate title
-                    pass
+            md_files = [Path(entry.path) for entry in entries if self.is_file_size_acceptable(entry)[0]]
+            
+            # Also read the first line of each note to check for alternate titles (like # Header),
+            # with several files open at once
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                first_lines = executor.map(self.read_first_line, md_files)
+                for file_path, first_line in zip(md_files, first_lines):
+                    # Use the filename without extension as the note title
+                    note_title = file_path.stem
+                    # Store the relative path from vault root
+                    relative_path = self.get_relative_path(file_path)
+                    existing_notes[note_title] = relative_path
+                    
+                    if first_line.startswith('#'):
+                        # Extract header text as alternate title
+                        header_title = first_line.lstrip('#').strip()
+                        if header_title and header_title != note_title:
+                            existing_notes[header_title] = relative_path
                     
         except Exception as e:
             tqdm.write(f"Warning: Failed to scan vault for existing notes: {e}")
@@ -775,151 +1631,49 @@ class ObsidianVaultReviewer:
         # Get comprehensive vault context
         vault_context = self.get_comprehensive_vault_context()
         
-        prompt = f"""
-Analyze this note content and identify concepts that should be atomic notes in a second brain/Zettelkasten system.
-
-CURRENT NOTE: {file_path.name}
-CONTENT TO ANALYZE:
-{content}
-
-FULL VAULT KNOWLEDGE CONTEXT:
-{vault_context}
-
-SMART ATOMIC NOTE IDENTIFICATION:
-Using the full vault context above, identify concepts that:
-1. Are mentioned in this note but don't have dedicated notes yet
-2. Would benefit multiple notes if extracted as atomic concepts  
-3. Represent foundational knowledge that appears across the vault
-4. Fill gaps in the existing knowledge network
-5. Would create valuable connections between existing notes
-
-ATOMIC NOTE PRINCIPLES:
-- Each note should contain ONE concept or idea
-- Notes should be understandable on their own
-- Notes should be linkable and reusable
-- Focus on concepts that appear multiple times or are foundational
-- Avoid duplicating existing notes (check vault context carefully)
-
-IDENTIFY MISSING ATOMIC CONCEPTS:
-1. Scan the vault context to see what concepts already exist
-2. Look for concepts in this note that would benefit the entire vault
-3. Consider concepts that would bridge knowledge gaps
-4. Think about foundational concepts that support multiple areas
-
-Return a JSON list of atomic concept titles that should exist as separate notes:
-{{
-    "atomic_concepts": [
-        "Concept Name 1",
-        "Concept Name 2", 
-        "Concept Name 3"
-    ]
-}}
-
-IMPORTANT:
-- Focus on 2-4 key concepts maximum (quality over quantity)
-- Use clear, descriptive titles (2-4 words)
-- DON'T suggest concepts that already exist in the vault (check the context above)
-- Prioritize concepts that would be useful across multiple existing notes
-- Consider how these concepts would connect to existing notes via [[WikiLinks]]
-"""
+        prompt = ATOMIC_CONCEPTS_PROMPT_TEMPLATE.format_map({
+            "file_name": file_path.name,
+            "content": content,
+            "vault_context": vault_context
+        })
 
         try:
-            response = self.handle_rate_limiting(self.model.generate_content, prompt)
+            response = self.handle_rate_limiting(
+                self.model.generate_content, prompt, generation_config=self.atomic_concepts_config
+            )
             response_text = response.text.strip()
             
-            # Clean up JSON response
-            if response_text.startswith('```json'):
-                response_text = response_text.split('```json')[1].split('```')[0]
-            elif response_text.startswith('```'):
-                response_text = response_text.split('```')[1].split('```')[0]
-            
-            response_text = response_text.strip()
-            
-            # Parse JSON
-            result = json.loads(response_text)
+            # Parse JSON (the schema makes this plain JSON; still tolerates fences and surrounding text)
+            result = self.extract_json_object(response_text)
+            if result is None:
+                raise ValueError("no JSON object found in response")
             return result.get('atomic_concepts', [])
-            
-        except Exception as e:
-            tqdm.write(f"Warning: Failed to identify atomic concepts: {e}")
-            return []
-            
-    def create_atomic_note(self, concept_title: str, original_content: str, file_context: str) -> str:
-        """
-        Create content for a new atomic note based on a concept.
-        Now uses full vault context for smarter note creation.
-        """
-        # Get comprehensive vault context
-        vault_context = self.get_comprehensive_vault_context()
-        
-        prompt = f"""
-Create content for a new atomic note in a second brain/Zettelkasten system.
-
-ATOMIC NOTE TITLE: {concept_title}
-
-CONTEXT (from original note):
-{original_content}
-
-ORIGINAL NOTE CONTEXT: {file_context}
-
-FULL VAULT KNOWLEDGE CONTEXT:
-{vault_context}
-
-SMART ATOMIC NOTE CREATION:
-Using the full vault context above, create an atomic note that:
-1. Focuses solely on the concept: {concept_title}
-2. Connects to existing notes in the vault via [[WikiLinks]]
-3. Fills knowledge gaps identified in the vault
-4. Uses terminology consistent with existing notes
-5. References related concepts that already exist
-6. Provides unique value not covered elsewhere
-
-WRITING GUIDELINES:
-- Use conversational but professional tone
-- Use inclusive language with "we," "let's," and "us"
-- Write clearly and concisely without Latin abbreviations
-- Use active voice over passive voice
-- Use globally accessible language, avoid idioms and colloquialisms
-- Do not reference timeframes or external content
-- Do not assume prior knowledge
-- Use precise, consistent terminology
-- Create stand-alone content that does not rely on external materials
-- Write content that is both technically accurate and engaging
-- Use generic references to AI assistants unless specifically needed
-- Use Oxford commas and proper formatting
-- Provide educational and thorough explanations with clear examples
-- Build understanding progressively
-- Use human and concise format
-- Avoid emojis and double dashes
-
-AVOID these complex or abstract terms: 'delve', 'meticulous,' 'navigating,' 'complexities,' 'realm,' 'bespoke,' 'tailored,' 'towards,' 'underpins,' 'ever-changing,' 'ever-evolving,' 'the world of,' 'not only,' 'seeking more than just,' 'designed to enhance,' 'it's not merely,' 'our suite,' 'it is advisable,' 'daunting,' 'in the heart of,' 'when it comes to,' 'in the realm of,' 'amongst,' 'unlock the secrets,' 'unveil the secrets,' 'transforms' and 'robust.'
-
-CREATE ATOMIC NOTE CONTENT:
-- Focus on ONE concept: {concept_title}
-- Make it understandable on its own
-- Include practical information, examples, or definitions
-- Add relevant context for personal knowledge management
-- Use clear structure with headers
-- Aim for 150-400 words (atomic but comprehensive)
-- Include related concepts using [[WikiLinks]] where appropriate
-
-ATOMIC NOTE PRINCIPLES:
-- Autonomy: Should be understandable without other notes
-- Atomicity: Contains only one main idea or concept
-- Linkability: Can be connected to other notes
-- Usefulness: Valuable for future reference
-
-Return ONLY the note content (no JSON, no explanations):
-"""
+            
+        except Exception as e:
+            tqdm.write(f"Warning: Failed to identify atomic concepts: {e}")
+            return []
+            
+    def create_atomic_note(self, concept_title: str, original_content: str, file_context: str) -> str:
+        """
+        Create content for a new atomic note based on a concept.
+        Now uses full vault context for smarter note creation.
+        """
+        # Get comprehensive vault context
+        vault_context = self.get_comprehensive_vault_context()
+        
+        prompt = ATOMIC_NOTE_PROMPT_TEMPLATE.format_map({
+            "concept_title": concept_title,
+            "original_content": original_content,
+            "file_context": file_context,
+            "vault_context": vault_context
+        })
 
         try:
             response = self.handle_rate_limiting(self.model.generate_content, prompt)
             content = response.text.strip()
             
             # Remove markdown code blocks if present
-            if content.startswith('```markdown'):
-                content = content.split('```markdown')[1].split('```')[0].strip()
-            elif content.startswith('```'):
-                content = content.split('```')[1].split('```')[0].strip()
+            content = self.strip_code_fence(content)
                 
             return content
             
@@ -933,8 +1687,7 @@ Return ONLY the note content (no JSON, no explanations):
         """
         try:
             # Clean the title to make it filename-safe
-            import re
-            safe_title = re.sub(r'[<>:"/\\|?*]', '', concept_title)
+            safe_title = UNSAFE_FILENAME_PATTERN.sub('', concept_title)
             safe_title = safe_title.strip()
             
             # Create the file path
@@ -992,109 +1745,39 @@ Return ONLY the note content (no JSON, no explanations):
             
             # Step 3: Create atomic notes for new concepts
             created_notes = []
+            new_concepts = []
             for concept in atomic_concepts:
-                if concept not in existing_notes:
+                if concept in existing_notes or concept in new_concepts:
+                    tqdm.write(f"Atomic note already exists: {concept}")
+                else:
                     tqdm.write(f"Creating atomic note: {concept}")
-                    atomic_content = self.create_atomic_note(concept, content, file_path.name)
+                    new_concepts.append(concept)
+                    
+            # Write the notes with concurrent requests, then save them in order
+            if new_concepts:
+                max_workers = max(1, min(len(new_concepts), self.config.get("batch_workers", 4)))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    atomic_contents = list(executor.map(
+                        lambda concept: self.create_atomic_note(concept, content, file_path.name), new_concepts
+                    ))
+                for concept, atomic_content in zip(new_concepts, atomic_contents):
                     if self.save_atomic_note(concept, atomic_content):
                         created_notes.append(concept)
                         # Track atomic notes created for progress reporting
                         self.atomic_notes_created.append(concept)
                         # Add to existing_notes for subsequent linking
                         existing_notes[concept] = f"{concept}.md"
-                else:
-                    tqdm.write(f"Atomic note already exists: {concept}")
         
         # Step 4: Get comprehensive vault context for smart enhancement
         vault_context = self.get_comprehensive_vault_context()
         
         # Step 5: Enhance the original note with full vault knowledge
-        prompt = f"""
-You are enhancing a note in a personal knowledge management system using atomic note principles.
-
-CURRENT NOTE TO ENHANCE:
-File: {file_path.name}
-===BEGIN ORIGINAL CONTENT===
-{content}
-===END ORIGINAL CONTENT===
-
-FULL VAULT KNOWLEDGE CONTEXT:
-{vault_context}
-
-NEWLY CREATED ATOMIC NOTES (link to these):
-{', '.join([f"[[{note}]]" for note in created_notes]) if created_notes else "None"}
-
-SMART NOTE ENHANCEMENT:
-Using the full vault context above, enhance this note by:
-1. Adding [[WikiLinks]] to existing notes throughout the content
-2. Connecting this note to the broader knowledge network
-3. Referencing newly created atomic notes where relevant
-4. Identifying knowledge gaps this note fills
-5. Using consistent terminology with existing notes
-6. Creating meaningful connections between concepts
-
-WRITING GUIDELINES:
-- Use conversational but professional tone
-- Use inclusive language with "we," "let's," and "us"
-- Write clearly and concisely without Latin abbreviations
-- Use active voice over passive voice
-- Use globally accessible language, avoid idioms and colloquialisms
-- Do not reference timeframes or external content
-- Do not assume prior knowledge
-- Use precise, consistent terminology
-- Create stand-alone content that does not rely on external materials
-- Write content that is both technically accurate and engaging
-- Use generic references to AI assistants unless specifically needed
-- Use Oxford commas and proper formatting
-- Provide educational and thorough explanations with clear examples
-- Build understanding progressively
-- Use human and concise format
-- Avoid emojis and double dashes
-
-AVOID these complex or abstract terms: 'delve', 'meticulous,' 'navigating,' 'complexities,' 'realm,' 'bespoke,' 'tailored,' 'towards,' 'underpins,' 'ever-changing,' 'ever-evolving,' 'the world of,' 'not only,' 'seeking more than just,' 'designed to enhance,' 'it's not merely,' 'our suite,' 'it is advisable,' 'daunting,' 'in the heart of,' 'when it comes to,' 'in the realm of,' 'amongst,' 'unlock the secrets,' 'unveil the secrets,' 'transforms' and 'robust.'
-
-YOUR TASK:
-Return the enhanced note content with ALL original content preserved exactly as written, plus your enhancements following atomic note principles.
-
-STRICT RULES FOR ENHANCEMENT:
-1. PRESERVE ALL ORIGINAL CONTENT: Keep every character, word, line, and formatting exactly as written above
-2. ONLY ADD NEW CONTENT: You may append or insert additional content, but never modify existing text
-3. NO CORRECTIONS: Do not fix typos, grammar, or formatting in the original content
-4. FOCUSED ENHANCEMENT: Add 1-3 meaningful sections only, avoid repetition
-5. NO DUPLICATE HEADERS: Never repeat the same header or content multiple times
-
-ATOMIC NOTE ENHANCEMENT FOCUS:
-- Link to relevant existing notes using [[WikiLinks]] - this is CRITICAL
-- Reference the newly created atomic notes where relevant
-- Add 1-2 sections maximum that provide value
-- Connect this note to the broader knowledge network
-- Include practical applications or personal insights
-- Use tags (#tag) for categorization
-- Aim for 2-4x the original length (not 10x+)
-- Keep sections focused and non-repetitive
-
-SMART LINKING STRATEGY:
-- Scan the vault context to identify ALL relevant existing notes
-- Use [[Note Name]] for existing notes whenever concepts are mentioned
-- Create natural connections throughout the content, not just at the end
-- Reference newly created atomic notes when discussing their concepts
-- Connect to 5-15 relevant existing notes (be comprehensive)
-- Use the exact note titles from the vault context
-- Create a rich knowledge network with meaningful connections
-- Add a "Related Notes" section if it adds value beyond inline links
-
-CRITICAL OUTPUT REQUIREMENTS:
-- Return ONLY the enhanced note content
-- Include ALL original content exactly as written
-- Do NOT repeat headers or create duplicate sections
-- Do NOT include any instructions, explanations, or commentary
-- Do NOT include any safety requirement text in the output
-- Do NOT include any metadata about the enhancement process
-- MUST include WikiLinks to existing notes - this is essential for knowledge management
-- Keep enhancement focused and concise (2-4x original length maximum)
-
-Begin your response with the enhanced note content now:
-"""
+        prompt = ENHANCE_NOTE_PROMPT_TEMPLATE.format_map({
+            "file_name": file_path.name,
+            "content": content,
+            "vault_context": vault_context,
+            "created_notes": ', '.join(f"[[{note}]]" for note in created_notes) if created_notes else "None"
+        })
 
         try:
             # Use rate limiting handler for the API call
@@ -1102,10 +1785,7 @@ Begin your response with the enhanced note content now:
             enhanced_content = response.text.strip()
             
             # Remove any markdown code blocks if present
-            if enhanced_content.startswith('```markdown'):
-                enhanced_content = enhanced_content.split('```markdown')[1].split('```')[0].strip()
-            elif enhanced_content.startswith('```'):
-                enhanced_content = enhanced_content.split('```')[1].split('```')[0].strip()
+            enhanced_content = self.strip_code_fence(enhanced_content)
             
             # ADDITIONAL SAFETY CHECK: Remove any leaked prompt instructions
             enhanced_content = self.clean_leaked_instructions(enhanced_content)
@@ -1177,10 +1857,9 @@ Begin your response with the enhanced note content now:
         enhanced_content = enhanced_content.replace("END ENHANCEMENT", "")
         
         # Use regex to remove any pattern like ===ANYTHING=== that looks like a marker
-        import re
-        enhanced_content = re.sub(r'={3,}[A-Z\s]+={3,}', '', enhanced_content)
+        enhanced_content = SECTION_MARKER_PATTERN.sub('', enhanced_content)
         # Also remove lines that are just === or similar
-        enhanced_content = re.sub(r'^={3,}$', '', enhanced_content, flags=re.MULTILINE)
+        enhanced_content = MARKER_LINE_PATTERN.sub('', enhanced_content)
         
         lines = enhanced_content.split('\n')
         clean_lines = []
@@ -1253,8 +1932,12 @@ Begin your response with the enhanced note content now:
         # Allow for minor formatting differences
         matched_lines = 0
         
+        # Lines without special characters, computed once per line instead of once per pair
+        enhanced_clean_lines = [PUNCTUATION_PATTERN.sub('', line.lower()) for line in enhanced_lines]
+        
         for orig_line in original_lines:
-            for enh_line in enhanced_lines:
+            orig_clean = PUNCTUATION_PATTERN.sub('', orig_line.lower()) if len(orig_line) > 5 else ''
+            for enh_line, enh_clean in zip(enhanced_lines, enhanced_clean_lines):
                 # Exact match
                 if orig_line == enh_line:
                     matched_lines += 1
@@ -1264,31 +1947,22 @@ Begin your response with the enhanced note content now:
                     matched_lines += 1
                     break
                 # Handle cases where formatting might change slightly
-                elif len(orig_line) > 5:
-                    # Remove special characters for comparison
-                    import re
-                    orig_clean = re.sub(r'[^\w\s]', '', orig_line.lower())
-                    enh_clean = re.sub(r'[^\w\s]', '', enh_line.lower())
-                    if orig_clean and orig_clean in enh_clean:
-                        matched_lines += 1
-                        break
+                elif orig_clean and orig_clean in enh_clean:
+                    matched_lines += 1
+                    break
         
         # Require at least 80% of original lines to be preserved
         preservation_ratio = matched_lines / len(original_lines) if original_lines else 1
         
         # Additional safety: check for key content preservation
         # Look for important patterns like [[links]], #tags, images, etc.
-        import re
-        
-        # Extract important elements from original
-        orig_links = re.findall(r'\[\[([^\]]+)\]\]', original)
-        orig_tags = re.findall(r'#(\w+)', original)
-        orig_images = re.findall(r'!\[[^\]]*\]\([^)]+\)', original)
+        orig_links = WIKILINK_PATTERN.findall(original)
+        orig_tags = PRESERVED_TAG_PATTERN.findall(original)
+        orig_images = IMAGE_PATTERN.findall(original)
         
         # Check these are preserved in enhanced version
-        enh_links = re.findall(r'\[\[([^\]]+)\]\]', enhanced)
-        enh_tags = re.findall(r'#(\w+)', enhanced)
-        enh_images = re.findall(r'!\[[^\]]*\]\([^)]+\)', enhanced)
+        enh_links = set(WIKILINK_PATTERN.findall(enhanced))
+        enh_tags = set(PRESERVED_TAG_PATTERN.findall(enhanced))
         
         # All original links, tags, and images should be preserved
         links_preserved = all(link in enh_links for link in orig_links)
@@ -1311,8 +1985,15 @@ Begin your response with the enhanced note content now:
     def signal_handler(self, signum, frame):
         """Handle interruption signals (Ctrl-C) gracefully."""
         print(f"\n\n🛑 Interrupted! Saving progress...")
+        self.shutdown_background_work()
+        self.wait_for_pending_deletes()
         try:
-            self.save_progress()
+            # A save interrupted mid-write may not have recorded its counts yet, so appending
+            # could log the same decisions twice; rewrite the whole snapshot instead
+            self.save_progress(sync=True, compact=self.saving_progress)
+            self.save_analysis_cache()
+            self.save_semantic_cache()
+            self.delete_rubric_cache()
             print("✅ Progress saved successfully.")
             print("You can continue the review by running the script again.")
         except Exception as e:
@@ -1320,23 +2001,166 @@ Begin your response with the enhanced note content now:
             print("Some progress may be lost.")
         sys.exit(0)
         
+    def apply_inline_formatting(self, text: str) -> str:
+        """Render markdown bold and italic spans with ANSI styles."""
+        if '*' not in text:
+            return text
+        if '**' in text:
+            text = self.style_bold_spans(text)
+        return self.style_italic_spans(text)
+        
+    def style_bold_spans(self, text: str) -> str:
+        """Wrap **bold** spans (no '*' inside) in bright style, scanning with str.find."""
+        parts = []
+        start = 0
+        pos = text.find('**')
+        while pos != -1:
+            end = text.find('*', pos + 2)
+            if end == -1:
+                break
+            if end > pos + 2 and text[end + 1:end + 2] == '*':
+                parts += (text[start:pos], Style.BRIGHT, text[pos + 2:end], Style.NORMAL)
+                start = end + 2
+                pos = text.find('**', start)
+            else:
+                pos = text.find('**', pos + 1)
+        if not parts:
+            return text
+        parts.append(text[start:])
+        return ''.join(parts)
+        
+    def style_italic_spans(self, text: str) -> str:
+        """Wrap *italic* spans that are not part of a ** run in true italics."""
+        parts = []
+        start = 0
+        pos = text.find('*')
+        while pos != -1:
+            end = text.find('*', pos + 1)
+            if end == -1:
+                break
+            if end > pos + 1 and (pos == 0 or text[pos - 1] != '*') and text[end + 1:end + 2] != '*':
+                parts += (text[start:pos], ITALIC_ON, text[pos + 1:end], ITALIC_OFF)
+                start = end + 1
+                pos = text.find('*', start)
+            else:
+                # The closing '*' is the next place a span could start
+                pos = end
+        if not parts:
+            return text
+        parts.append(text[start:])
+        return ''.join(parts)
+        
+    def replace_wikilinks(self, text: str) -> str:
+        """Show Obsidian [[links]] as →link."""
+        parts = []
+        start = 0
+        pos = text.find('[[')
+        while pos != -1:
+            end = text.find(']', pos + 2)
+            if end == -1:
+                break
+            if end > pos + 2 and text[end + 1:end + 2] == ']':
+                parts += (text[start:pos], '→', text[pos + 2:end])
+                start = end + 2
+                pos = text.find('[[', start)
+            else:
+                pos = text.find('[[', pos + 1)
+        if not parts:
+            return text
+        parts.append(text[start:])
+        return ''.join(parts)
+        
+    def strip_markdown_links(self, text: str) -> str:
+        """Replace [text](url) links with their text."""
+        parts = []
+        start = 0
+        pos = text.find('[')
+        while pos != -1:
+            end = text.find(']', pos + 1)
+            if end == -1:
+                break
+            if end > pos + 1 and text[end + 1:end + 2] == '(':
+                close = text.find(')', end + 2)
+                if close == -1:
+                    break
+                if close > end + 2:
+                    parts += (text[start:pos], text[pos + 1:end])
+                    start = close + 1
+                    pos = text.find('[', start)
+                    continue
+            pos = text.find('[', pos + 1)
+        if not parts:
+            return text
+        parts.append(text[start:])
+        return ''.join(parts)
+        
+    def classify_preview_line(self, line: str) -> str:
+        """
+        Classify a stripped, non-empty line for the preview as 'header', 'table',
+        'list', 'numbered', 'code' or 'text', looking at as few characters as possible.
+        """
+        # One lookup on the first character picks the only check that can still apply
+        kind = PREVIEW_LINE_STARTS.get(line[0])
+        if kind == 'header':
+            return kind
+        # A table row needs two pipes; stop looking once the second one is found
+        pipe = line.find('|')
+        if pipe != -1 and line.find('|', pipe + 1) != -1:
+            return 'table'
+        if kind is None:
+            # Digits outside ASCII still start a numbered item
+            if not line[0].isdecimal():
+                return 'text'
+            kind = 'numbered'
+        if kind == 'list':
+            return kind if line[1:2] == ' ' else 'text'
+        if kind == 'numbered':
+            end = 1
+            while end < len(line) and line[end].isdecimal():
+                end += 1
+            return kind if line.startswith('. ', end) else 'text'
+        return kind if line.startswith('```') else 'text'
+        
+    def iter_lines(self, text: str):
+        """Yield the lines of text like text.split('\n'), without splitting past the lines actually used."""
+        start = 0
+        end = text.find('\n')
+        while end != -1:
+            yield text[start:end]
+            start = end + 1
+            end = text.find('\n', start)
+        yield text[start:]
+        
     def format_markdown_preview(self, content: str, max_length: int = 600) -> str:
-        """Format markdown content for a readable preview."""
-        lines = content.split('\n')
+        """
+        Format markdown content for a readable preview. The last preview is kept, since
+        the analysis is shown again each time the user returns from the full-content view.
+        """
+        cached_content, cached_length, cached_preview = self.preview_cache
+        if cached_content is content and cached_length == max_length:
+            return cached_preview
         formatted_lines = []
-        
-        for line in lines:
+        formatted_length = 0
+        counted_lines = 0
+        
+        for line in self.iter_lines(content):
+            # Everything past max_length is cut below, so stop formatting once we get there
+            if len(formatted_lines) > counted_lines:
+                formatted_length += len(formatted_lines[-1]) + 1
+                counted_lines = len(formatted_lines)
+                if formatted_length - 1 > max_length:
+                    break
             line = line.strip()
             if not line:
                 continue
+            kind = self.classify_preview_line(line)
                 
             # Handle headers
-            if line.startswith('#'):
+            if kind == 'header':
                 level = len(line) - len(line.lstrip('#'))
                 header_text = line.lstrip('# ').strip()
                 # Apply bold and italic formatting to header text
-                formatted_header = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', header_text)
-                formatted_header = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', formatted_header)
+                formatted_header = self.apply_inline_formatting(header_text)
                 if level == 1:
                     formatted_lines.append(f"\n📋 {formatted_header}")
                 elif level == 2:
@@ -1345,41 +2169,38 @@ Begin your response with the enhanced note content now:
                     formatted_lines.append(f"\n• {formatted_header}")
                     
             # Handle tables
-            elif '|' in line and line.count('|') >= 2:
+            elif kind == 'table':
                 # Parse table row
                 cells = [cell.strip() for cell in line.split('|')[1:-1]]  # Remove empty first/last
                 if len(cells) > 0:
                     # Skip table separator lines
                     if not all(c in '-:| ' for c in line):
                         # Apply bold formatting to cells
-                        formatted_cells = []
-                        for cell in cells:
-                            formatted_cell = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', cell)
-                            formatted_cell = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', formatted_cell)
-                            formatted_cells.append(formatted_cell)
+                        formatted_cells = [self.apply_inline_formatting(cell) for cell in cells]
                         formatted_lines.append(f"  {' • '.join(formatted_cells)}")
                         
             # Handle lists
-            elif line.startswith(('- ', '* ', '+ ')):
-                list_content = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', line[2:])
-                list_content = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', list_content)
+            elif kind == 'list':
+                list_content = self.apply_inline_formatting(line[2:])
                 formatted_lines.append(f"  • {list_content}")
-            elif re.match(r'^\d+\. ', line):
-                list_content = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', line)
-                list_content = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', list_content)
+            elif kind == 'numbered':
+                list_content = self.apply_inline_formatting(line)
                 formatted_lines.append(f"  {list_content}")
                 
             # Handle code blocks (skip content but show indicator)
-            elif line.startswith('```'):
+            elif kind == 'code':
                 formatted_lines.append("  [Code Block]")
                 
             # Handle regular text
             else:
-                # Remove markdown links and formatting, but preserve bold
-                cleaned = re.sub(r'\[\[([^\]]+)\]\]', r'→\1', line)  # Obsidian links
-                cleaned = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', cleaned)  # Regular links
-                cleaned = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', cleaned)  # Bold
-                cleaned = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', cleaned)  # Italic (true italics)
+                # Remove markdown links and formatting, but preserve bold.
+                # Each pass needs its own marker, so a line only goes through the passes it can match.
+                cleaned = line
+                if '[[' in cleaned:
+                    cleaned = self.replace_wikilinks(cleaned)  # Obsidian links
+                if '](' in cleaned:
+                    cleaned = self.strip_markdown_links(cleaned)  # Regular links
+                cleaned = self.apply_inline_formatting(cleaned)  # Bold and italic
                 if cleaned.strip():
                     formatted_lines.append(f"  {cleaned}")
         
@@ -1388,10 +2209,31 @@ Begin your response with the enhanced note content now:
         if len(preview_text) > max_length:
             preview_text = preview_text[:max_length] + "..."
             
+        self.preview_cache = (content, max_length, preview_text)
         return preview_text
 
+    def visual_width(self, text: str) -> int:
+        """Length of text without ANSI style codes (ESC [ digits/semicolons m), counted without building a copy."""
+        if '\x1b' not in text:
+            return len(text)
+        width = len(text)
+        pos = text.find('\x1b[')
+        while pos != -1:
+            end = pos + 2
+            while end < len(text) and text[end] in '0123456789;':
+                end += 1
+            if end < len(text) and text[end] == 'm':
+                width -= end + 1 - pos
+                pos = text.find('\x1b[', end + 1)
+            else:
+                pos = text.find('\x1b[', pos + 1)
+        return width
+        
     def format_markdown_table(self, content: str) -> str:
         """Format markdown tables for better readability."""
+        # Without a pipe there is no table row, and the split/join below would only copy the text
+        if '|' not in content:
+            return content
         lines = content.split('\n')
         formatted_lines = []
         in_table = False
@@ -1413,10 +2255,15 @@ Begin your response with the enhanced note content now:
                     formatted_cells = []
                     for cell in cells:
                         # Apply bold and italic formatting to cell content
-                        formatted_cell = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', cell)
-                        formatted_cell = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', formatted_cell)
-                        # Calculate visual width (excluding ANSI codes) for proper spacing
-                        visual_width = len(re.sub(r'\x1b\[[0-9;]*m', '', formatted_cell))
+                        formatted_cell = self.apply_inline_formatting(cell)
+                        # Calculate visual width (excluding ANSI codes) for proper spacing. When the cell
+                        # had no escape codes of its own, the only ones are the known inline styles.
+                        if formatted_cell is cell or '\x1b' in cell:
+                            visual_width = self.visual_width(formatted_cell)
+                        else:
+                            visual_width = len(formatted_cell) - sum(
+                                formatted_cell.count(code) * length for code, length in INLINE_STYLE_CODES
+                            )
                         padding = max(0, 15 - visual_width)
                         formatted_cells.append(formatted_cell + ' ' * padding)
                     
@@ -1435,29 +2282,58 @@ Begin your response with the enhanced note content now:
         return '\n'.join(formatted_lines)
         
     def make_clickable_path(self, file_path: Path) -> str:
-        """Create a clickable file path that opens in Obsidian or default application."""
-        # Get absolute path for file:// URL
-        abs_path = file_path.resolve()
-        
-        # Try to create Obsidian URL (obsidian://open?file=...)
-        rel_path = file_path.relative_to(self.vault_path)
-        vault_name = self.vault_path.name
-        obsidian_url = f"obsidian://open?vault={vault_name}&file={rel_path}"
-        
-        # Create clickable link with both Obsidian and file URLs as fallback
-        clickable = f"\033]8;;{obsidian_url}\033\\{file_path.name}\033]8;;\033\\"
-        
+        """Create a clickable file path that opens in Obsidian or default application, memoized per file."""
+        key = str(file_path)
+        clickable = self.clickable_paths.get(key)
+        if clickable is None:
+            # Try to create Obsidian URL (obsidian://open?file=...), escaping spaces and other special characters
+            obsidian_url = self.obsidian_url_prefix + urllib.parse.quote(self.get_relative_path(file_path), safe='')
+            
+            # Create clickable link with both Obsidian and file URLs as fallback
+            clickable = f"\033]8;;{obsidian_url}\033\\{file_path.name}\033]8;;\033\\"
+            self.clickable_paths[key] = clickable
         return clickable
         
-    def save_progress(self):
-        """Save current progress to file."""
+    def save_progress_periodically(self):
+        """Save progress once every progress_save_interval decisions; review_vault saves the rest when it ends."""
+        if (self.last_saved_counts is None
+                or len(self.processed_files) - self.last_saved_counts[0] >= self.config.get("progress_save_interval", 10)):
+            self.save_progress()
+            
+    def save_progress(self, sync: bool = False, compact: bool = False):
+        """
+        Save current progress, skipping the write when no decision was recorded since the last save.
+        New decisions are appended to the progress log; the full progress file is only rewritten
+        (and the log truncated) on the first save, after a removal, or once the log grows long.
+        With sync, the write is flushed to disk before returning (used on Ctrl-C).
+        """
+        counts = (
+            len(self.processed_files), len(self.deleted_files), len(self.kept_files),
+            len(self.enhanced_files), len(self.atomic_notes_created), len(getattr(self, 'atomic_notes_reviewed', []))
+        )
+        if counts == self.last_saved_counts and self.progress_file.exists() and not compact:
+            return
+            
+        self.saving_progress = True
+        try:
+            if (compact or self.last_saved_counts is None or not self.progress_file.exists()
+                    or self.progress_log_records >= PROGRESS_LOG_COMPACT_RECORDS
+                    or any(new < old for new, old in zip(counts, self.last_saved_counts))):
+                self.write_progress_snapshot(counts, sync)
+            else:
+                self.append_progress_record(counts, sync)
+        finally:
+            self.saving_progress = False
+            
+    def write_progress_snapshot(self, counts: tuple, sync: bool):
+        """Rewrite the full progress file and truncate the progress log."""
         # Preserve original session start time if continuing a session
         session_start = getattr(self, 'original_session_start', time.strftime("%Y-%m-%d %H:%M:%S"))
         
         progress_data = {
             "session_start": session_start,
             "vault_path": str(self.vault_path),
-            "processed_files": list(self.processed_files),
+            "processed_files": self.processed_files,
             "deleted_files": [str(f) for f in self.deleted_files],
             "kept_files": [str(f) for f in self.kept_files],
             "enhanced_files": [str(f) for f in self.enhanced_files],
@@ -1467,28 +2343,89 @@ Begin your response with the enhanced note content now:
             "config": self.config
         }
         
+        # Write to a temporary file and swap it in, so a kill mid-write never leaves a torn progress file.
+        # Unbuffered, so a save cut short by Ctrl-C has nothing left to flush over the handler's own write.
+        temp_file = self.progress_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'wb', buffering=0) as f:
+                f.write(orjson.dumps(progress_data))
+                if sync:
+                    os.fsync(f.fileno())
+            os.replace(temp_file, self.progress_file)
+            # The snapshot already holds everything the log recorded
+            with open(self.progress_log_file, 'wb'):
+                pass
+            self.progress_log_records = 0
+            self.last_saved_counts = counts
+        except Exception as e:
+            print(f"Warning: Failed to save progress: {e}")
+            
+    def append_progress_record(self, counts: tuple, sync: bool):
+        """Append the decisions made since the last save to the progress log as one JSON line."""
+        processed, deleted, kept, enhanced, created, reviewed = self.last_saved_counts
+        atomic_notes_reviewed = getattr(self, 'atomic_notes_reviewed', [])
+        new_processed = counts[0] - processed
+        record = {
+            # Dicts keep insertion order, so the newest entries are the last ones
+            "processed_files": {key: self.processed_files[key] for key in islice(reversed(self.processed_files), new_processed)},
+            "deleted_files": [str(f) for f in self.deleted_files[deleted:]],
+            "kept_files": [str(f) for f in self.kept_files[kept:]],
+            "enhanced_files": [str(f) for f in self.enhanced_files[enhanced:]],
+            "atomic_notes_created": self.atomic_notes_created[created:],
+            "atomic_notes_reviewed": atomic_notes_reviewed[reviewed:],
+        }
         try:
-            with open(self.progress_file, 'w') as f:
-                json.dump(progress_data, f, indent=2)
+            with open(self.progress_log_file, 'ab', buffering=0) as f:
+                f.write(orjson.dumps({key: value for key, value in record.items() if value}) + b"\n")
+                if sync:
+                    os.fsync(f.fileno())
+            self.progress_log_records += 1
+            self.last_saved_counts = counts
         except Exception as e:
             print(f"Warning: Failed to save progress: {e}")
             
+    def replay_progress_log(self, progress_data: dict):
+        """Apply the decisions recorded in the progress log on top of the loaded progress file."""
+        try:
+            lines = self.progress_log_file.read_bytes().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # A kill mid-append can leave a torn last line
+                continue
+            progress_data.setdefault("processed_files", {}).update(record.get("processed_files", {}))
+            for key in ("deleted_files", "kept_files", "enhanced_files", "atomic_notes_created", "atomic_notes_reviewed"):
+                progress_data.setdefault(key, []).extend(record.get(key, []))
+        self.progress_log_records = len(lines)
+            
     def load_progress(self) -> bool:
         """Load progress from file if it exists. Returns True if progress was loaded."""
         if not self.progress_file.exists():
             return False
             
         try:
-            with open(self.progress_file, 'r') as f:
-                progress_data = json.load(f)
+            progress_data = orjson.loads(self.progress_file.read_bytes())
                 
             # Verify this progress file is for the same vault
             if progress_data.get("vault_path") != str(self.vault_path):
                 print(f"Progress file is for a different vault: {progress_data.get('vault_path')}")
                 return False
+            self.replay_progress_log(progress_data)
                 
             # Load progress
-            self.processed_files = set(progress_data.get("processed_files", []))
+            processed_files = progress_data.get("processed_files", {})
+            if isinstance(processed_files, list):
+                # Older progress files only list paths, without a signature to detect later edits
+                processed_files = dict.fromkeys(processed_files)
+            # Older progress files also used absolute paths as keys
+            prefix_length = len(self.vault_prefix)
+            self.processed_files = {
+                (key[prefix_length:] if key.startswith(self.vault_prefix) else key): signature
+                for key, signature in processed_files.items()
+            }
             self.deleted_files = [Path(f) for f in progress_data.get("deleted_files", [])]
             self.kept_files = [Path(f) for f in progress_data.get("kept_files", [])]
             self.enhanced_files = [Path(f) for f in progress_data.get("enhanced_files", [])]
@@ -1516,6 +2453,7 @@ Begin your response with the enhanced note content now:
     def cleanup_progress_file(self):
         """Remove the progress file when review is complete."""
         try:
+            self.progress_log_file.unlink(missing_ok=True)
             if self.progress_file.exists():
                 self.progress_file.unlink()
                 print("Progress file cleaned up.")
@@ -1526,9 +2464,7 @@ Begin your response with the enhanced note content now:
         """Save the most recently used vault path."""
         config_file = Path.home() / ".obsidian_vault_reviewer_config.json"
         try:
-            config_data = {"last_vault_path": str(vault_path)}
-            with open(config_file, 'w') as f:
-                json.dump(config_data, f)
+            config_file.write_bytes(orjson.dumps({"last_vault_path": str(vault_path)}))
         except Exception as e:
             # Silently fail - this is just a convenience feature
             pass
@@ -1543,13 +2479,26 @@ Begin your response with the enhanced note content now:
             "show_auto_decisions": True,
             "max_file_size_kb": 20,  # Ignore files larger than 20 KB
             "show_skipped_files": True,  # Show which files are skipped due to size
-            "include_subfolders": True  # Include subfolders when scanning for files
+            "include_subfolders": True,  # Include subfolders when scanning for files
+            "batch_analysis_enabled": False,  # Queue every note for background analysis when the review starts
+            "batch_workers": 4,  # Concurrent API requests used by batch and lookahead analysis
+            "analysis_lookahead": 8,  # Upcoming notes analyzed in the background during review
+            "progress_save_interval": 10,  # Review decisions recorded per progress save (Ctrl-C always saves)
+            "requests_per_minute": 15,  # Gemini API request budget
+            "tokens_per_minute": 1000000,  # Gemini API prompt token budget
+            "semantic_cache_enabled": False,  # Reuse analyses of near-duplicate notes
+            "semantic_cache_threshold": 0.92,  # Minimum cosine similarity for a cache hit
+            "duplicate_clustering_enabled": False,  # Analyze one note per group of near-duplicates
+            "duplicate_cluster_threshold": 0.95,  # Minimum cosine similarity to group two notes
+            "move_to_trash": True,  # Send deleted notes to the system trash instead of removing them
+            "templates_folder": "Templates",  # Vault folder holding note templates; unedited copies are scored locally
+            "small_note_group_size": 8,  # Small notes analyzed together in one batch request (1 to turn off)
+            "small_note_max_chars": 500  # Notes up to this size are grouped in batch analysis
         }
         
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    saved_config = json.load(f)
+                saved_config = orjson.loads(self.config_file.read_bytes())
                 # Merge with defaults to handle new settings
                 default_config.update(saved_config)
                 subfolder_status = "including" if default_config['include_subfolders'] else "excluding"
@@ -1562,8 +2511,8 @@ Begin your response with the enhanced note content now:
     def save_config(self):
         """Save current configuration to file."""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            # One serialized buffer and one write, instead of json.dump's many small writes
+            self.config_file.write_bytes(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
         except Exception as e:
             print(f"Warning: Could not save settings file: {e}")
 
@@ -1573,85 +2522,311 @@ Begin your response with the enhanced note content now:
         config_file = Path.home() / ".obsidian_vault_reviewer_config.json"
         try:
             if config_file.exists():
-                with open(config_file, 'r') as f:
-                    config_data = json.load(f)
-                return config_data.get("last_vault_path")
+                return orjson.loads(config_file.read_bytes()).get("last_vault_path")
         except Exception as e:
             # Silently fail - this is just a convenience feature
             pass
         return None
         
+    def scan_markdown_entries(self, root: Path, recursive: bool = True):
+        """
+        Yield os.DirEntry objects for markdown files under root using os.scandir.
+        Directory entries carry their file type, so no stat() is needed to walk,
+        and an entry caches its stat() once taken for the size and change checks.
+        Hidden folders such as .obsidian and .trash are skipped.
+        """
+        pending = [str(root)]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive and not entry.name.startswith('.'):
+                                    pending.append(entry.path)
+                            elif entry.name.endswith('.md') and entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError as e:
+                tqdm.write(f"Warning: Could not scan {directory}: {e}")
+                
+    def get_relative_path(self, file_path: Path) -> str:
+        """Return the path relative to the vault root as a string, memoized per file."""
+        key = str(file_path)
+        rel_path = self.relative_paths.get(key)
+        if rel_path is None:
+            # Paths from the scanner start with the vault path, so slicing avoids relative_to's checks
+            # (and every caller wants the string, so no Path object is built)
+            if key.startswith(self.vault_prefix):
+                rel_path = key[len(self.vault_prefix):]
+            else:
+                rel_path = str(file_path.relative_to(self.vault_path))
+            self.relative_paths[key] = rel_path
+        return rel_path
+        
+    def split_by_size(self, entries) -> tuple[List[tuple[Path, os.DirEntry]], List[tuple[Path, int]]]:
+        """
+        Split scanned entries into (path, entry) pairs within the size limit, sorted
+        by path, and (path, size_kb) pairs for files that are too large.
+        Only the files that are kept or reported are wrapped in Path objects.
+        """
+        acceptable_files = []
+        skipped_files = []
+        for entry in entries:
+            is_acceptable, size_kb = self.is_file_size_acceptable(entry)
+            if is_acceptable:
+                acceptable_files.append((Path(entry.path), entry))
+            else:
+                skipped_files.append((Path(entry.path), size_kb))
+        # Path objects compare by their case-normalized parts; splitting the entry's path string
+        # gives the same order without going through Path's comparison machinery
+        acceptable_files.sort(key=lambda item: os.path.normcase(item[1].path).split(os.sep))
+        return acceptable_files, skipped_files
+        
     def find_markdown_files(self) -> List[Path]:
         """Recursively find all markdown files in the vault."""
         print(f"Scanning vault: {self.vault_path}")
         
         # Respect subfolder configuration
         if self.config.get("include_subfolders", True):
-            md_files = list(self.vault_path.rglob("*.md"))
+            entries = self.scan_markdown_entries(self.vault_path, recursive=True)
             scan_type = "recursively (including subfolders)"
         else:
-            md_files = list(self.vault_path.glob("*.md"))
+            entries = self.scan_markdown_entries(self.vault_path, recursive=False)
             scan_type = "in root directory only"
             
         print(f"Scanning {scan_type}")
         
-        # Ensure only .md files (filter out any edge cases)
-        md_files = [f for f in md_files if f.suffix.lower() == '.md']
-        
-        # Filter by file size
-        acceptable_files = []
-        skipped_files = []
+        # Filter by file size and sort files alphabetically
+        acceptable_files, skipped_files = self.split_by_size(entries)
         max_size_kb = self.config.get("max_file_size_kb", 30)
-        
-        for file_path in md_files:
-            is_acceptable, size_kb = self.is_file_size_acceptable(file_path)
-            if is_acceptable:
-                acceptable_files.append(file_path)
-            else:
-                skipped_files.append((file_path, size_kb))
-        
-        md_files = acceptable_files
-        md_files.sort()  # Sort files alphabetically
+        md_files = [file_path for file_path, _ in acceptable_files]
         
         print(f"Found {len(md_files)} markdown files (.md only, ≤{max_size_kb}KB)")
         if skipped_files:
             print(f"Skipped {len(skipped_files)} large files (>{max_size_kb}KB)")
         
-        # Filter out already processed files
+        # Filter out already processed files, unless they were edited since they were reviewed
         if self.processed_files:
-            unprocessed_files = [f for f in md_files if str(f) not in self.processed_files]
+            unprocessed_files = []
+            changed_files = set()
+            for f, entry in acceptable_files:
+                key = self.progress_key(f)
+                if key not in self.processed_files:
+                    unprocessed_files.append(f)
+                elif not self.is_unchanged_since_processed(f, entry.stat()):
+                    del self.processed_files[key]
+                    unprocessed_files.append(f)
+                    changed_files.add(f)
             print(f"Unprocessed files: {len(unprocessed_files)}")
+            if changed_files:
+                print(f"Re-reviewing {len(changed_files)} files changed since they were processed")
+                # Their old decisions are replaced by the new review instead of piling up across sessions
+                self.kept_files = [f for f in self.kept_files if f not in changed_files]
+                self.deleted_files = [f for f in self.deleted_files if f not in changed_files]
             return unprocessed_files
         
         return md_files
         
-    def read_file_content(self, file_path: Path) -> str:
-        """Read the content of a markdown file."""
+    def file_signature(self, file_path: Path) -> Optional[Dict]:
+        """Return the size, mtime and content hash recorded for a processed file."""
+        try:
+            stat = file_path.stat()
+            return {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "hash": hashlib.sha256(file_path.read_bytes()).hexdigest()
+            }
+        except OSError:
+            return None
+            
+    def progress_key(self, file_path: Path) -> str:
+        """Key for a file in processed_files: its path relative to the vault root."""
+        return self.get_relative_path(file_path)
+        
+    def mark_processed(self, file_path: Path):
+        """
+        Record a file as processed along with its current signature, reusing the one
+        computed when the file was prefetched if the file has not changed since.
+        """
+        signature = self.file_signatures.pop(str(file_path), None)
+        if signature is not None:
+            try:
+                stat = file_path.stat()
+                if stat.st_size != signature["size"] or stat.st_mtime_ns != signature["mtime_ns"]:
+                    signature = None
+            except OSError:
+                signature = None
+        if signature is None:
+            signature = self.file_signature(file_path)
+        self.processed_files[self.progress_key(file_path)] = signature
+        
+    def is_unchanged_since_processed(self, file_path: Path, stat: Optional[os.stat_result] = None) -> bool:
+        """
+        Check whether a processed file still matches its recorded signature.
+        A matching size and mtime is enough; only when the mtime moved is the file hashed.
+        """
+        signature = self.processed_files.get(self.progress_key(file_path))
+        if signature is None:
+            return True
+        try:
+            if stat is None:
+                stat = file_path.stat()
+            if stat.st_size != signature["size"]:
+                return False
+            if stat.st_mtime_ns == signature["mtime_ns"]:
+                return True
+            return hashlib.sha256(file_path.read_bytes()).hexdigest() == signature["hash"]
+        except OSError:
+            return True
+            
+    def read_file_content(self, file_path: Path, max_chars: int = -1) -> str:
+        """Read the content of a markdown file (only the first max_chars characters if given)."""
         try:
+            if max_chars < 0:
+                # One open/read/close for the whole file
+                return file_path.read_text(encoding='utf-8')
             with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+                return f.read(max_chars)
         except Exception as e:
             tqdm.write(f"Error reading {file_path}: {e}")
             return ""
             
+    def read_first_line(self, file_path: Path) -> str:
+        """Read the stripped first line of a file, or an empty string if it cannot be read."""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.readline().strip()
+        except Exception:
+            return ""
+            
+    def read_many(self, file_paths: List[Path], max_workers: int = 16, max_chars: int = -1):
+        """
+        Read many files concurrently, yielding (path, content) in the given order.
+        The worker count bounds how many files are open at once.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contents = executor.map(lambda file_path: self.read_file_content(file_path, max_chars), file_paths)
+            yield from zip(file_paths, contents)
+            
+    def read_bytes_with_stat(self, file_path: Path) -> tuple[bytes, os.stat_result]:
+        """
+        Read a whole file and stat it through one descriptor: open, fstat, one read sized
+        from the stat, close. This skips the separate stat() and the isatty/fstat calls
+        that open() and read_bytes() make for every small note.
+        """
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            stat = os.fstat(fd)
+            # Empty notes need no read (a later write changes the mtime, so get_file_content re-reads)
+            if not stat.st_size:
+                return b"", stat
+            # One byte more than the size, so a file that grew since the fstat is noticed
+            data = os.read(fd, stat.st_size + 1)
+            if len(data) > stat.st_size:
+                chunks = [data]
+                while chunk := os.read(fd, 1 << 16):
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+            return data, stat
+        finally:
+            os.close(fd)
+            
+    def read_file_snapshot(self, file_path: Path) -> tuple[str, int, Optional[Dict]]:
+        """
+        Read a file along with its modification time, so stale prefetches can be detected,
+        and its processed-file signature, so the hash is computed off the main thread.
+        """
+        try:
+            data, stat = self.read_bytes_with_stat(file_path)
+            # Decode like text mode would, with universal newlines
+            content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        except (OSError, UnicodeDecodeError):
+            return self.read_file_content(file_path), 0, None
+        signature = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": hashlib.sha256(data).hexdigest()
+        }
+        return content, stat.st_mtime_ns, signature
+            
+    def prefetch_file_contents(self, file_paths: List[Path]):
+        """Start reading upcoming files in background threads so disk latency overlaps the review."""
+        if self.read_executor is None:
+            self.read_executor = ThreadPoolExecutor(max_workers=8)
+        for file_path in file_paths:
+            key = str(file_path)
+            if key not in self.content_futures:
+                self.content_futures[key] = self.read_executor.submit(self.read_file_snapshot, file_path)
+                
+    def get_file_content(self, file_path: Path) -> str:
+        """Return prefetched content for a file, re-reading it if it changed since the prefetch."""
+        future = self.content_futures.pop(str(file_path), None)
+        if future is None:
+            return self.read_file_content(file_path)
+        content, mtime_ns, signature = future.result()
+        try:
+            if file_path.stat().st_mtime_ns != mtime_ns:
+                return self.read_file_content(file_path)
+        except OSError:
+            pass
+        if signature is not None:
+            self.file_signatures[str(file_path)] = signature
+        return content
+        
+    def prefetch_analyses(self, file_paths: List[Path]):
+        """
+        Analyze upcoming notes in background threads so API latency is hidden
+        behind the time the user spends deciding on the current note.
+        """
+        if self.analysis_executor is None:
+            self.analysis_executor = ThreadPoolExecutor(max_workers=max(1, self.config.get("batch_workers", 4)))
+        for file_path in file_paths:
+            key = str(file_path)
+            if key in self.analysis_futures or key in self.duplicate_siblings:
+                continue
+            if key not in self.content_futures:
+                self.prefetch_file_contents([file_path])
+            self.analysis_futures[key] = self.analysis_executor.submit(
+                self.analyze_prefetched_content, file_path, self.content_futures[key]
+            )
+            
+    def analyze_prefetched_content(self, file_path: Path, content_future) -> tuple[Dict, str]:
+        """Worker for prefetch_analyses: wait for the file read, then analyze it."""
+        content = content_future.result()[0]
+        return self.analyze_note_relevance(file_path, content), content
+        
+    def get_prefetched_analysis(self, file_path: Path, content: str) -> Optional[Dict]:
+        """Return the background analysis for a file if it was made from the same content."""
+        future = self.analysis_futures.pop(str(file_path), None)
+        if future is None:
+            return None
+        try:
+            analysis, analyzed_content = future.result()
+        except Exception as e:
+            tqdm.write(f"Background analysis failed for {file_path.name}: {e}")
+            return None
+        return analysis if analyzed_content == content else None
+        
+    def shutdown_background_work(self):
+        """Cancel prefetched reads and analyses that will not be used."""
+        self.stop_event.set()
+        for executor in (self.read_executor, self.analysis_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.read_executor = None
+        self.analysis_executor = None
+        self.content_futures.clear()
+        self.analysis_futures.clear()
+            
     def parse_ai_response_fallback(self, response_text: str) -> Dict:
         """Fallback parser using regex when JSON parsing fails completely."""
-        import re
-        
         # Try to extract score using various patterns
         score = 5  # default
-        score_patterns = [
-            r'"score":\s*(\d+)',
-            r'"score":\s*"(\d+)"',
-            r'score:\s*(\d+)',
-            r'Score:\s*(\d+)',
-            r'relevance score.*?(\d+)',
-            r'(\d+)/10',
-            r'score.*?(\d+)'
-        ]
-        
-        for pattern in score_patterns:
-            match = re.search(pattern, response_text, re.IGNORECASE)
+        for pattern in FALLBACK_SCORE_PATTERNS:
+            match = pattern.search(response_text)
             if match:
                 try:
                     score = int(match.group(1))
@@ -1662,41 +2837,50 @@ Begin your response with the enhanced note content now:
         
         # Try to extract reasoning
         reasoning = "AI analysis completed but response format was unclear."
-        reasoning_patterns = [
-            r'"reasoning":\s*"([^"]+)"',
-            r'"reasoning":\s*([^,}]+)',
-            r'reasoning:\s*([^,}]+)',
-            r'Reasoning:\s*([^,}]+)',
-            r'because\s+([^.]+)',
-            r'This\s+([^.]+\.)' 
-        ]
-        
-        for pattern in reasoning_patterns:
-            match = re.search(pattern, response_text, re.IGNORECASE | re.DOTALL)
+        for pattern in FALLBACK_REASONING_PATTERNS:
+            match = pattern.search(response_text)
             if match:
                 extracted = match.group(1).strip().strip('"').strip("'")
                 if len(extracted) > 10:  # Make sure we got something meaningful
                     reasoning = extracted[:200] + "..." if len(extracted) > 200 else extracted
                     break
         
-        # Determine recommendation based on score
-        if score <= 4:
-            recommendation = "remove"
-        elif score <= 7:
-            recommendation = "enhance"
-        else:
-            recommendation = "keep"
-            
+        # Determine recommendation based on score (the patterns only match digits, so it is never negative)
         return {
             "score": score,
             "reasoning": reasoning,
-            "recommendation": recommendation
+            "recommendation": SCORE_RECOMMENDATIONS[min(score, 10)]
         }
     
+    def extract_json_object(self, response_text: str) -> Optional[Dict]:
+        """
+        Parse a JSON object from an AI response.
+        Tries the whole text first, then the first balanced {...} block, which
+        also covers responses wrapped in code fences or surrounded by prose.
+        """
+        # orjson parses several times faster than json, which adds up over a batch of analyses
+        try:
+            result = orjson.loads(response_text)
+            if isinstance(result, dict):
+                return result
+        except orjson.JSONDecodeError:
+            pass
+            
+        match = JSON_OBJECT_PATTERN.search(response_text)
+        if match:
+            try:
+                return orjson.loads(match.group(0))
+            except orjson.JSONDecodeError:
+                pass
+        return None
+    
+    def strip_code_fence(self, text: str) -> str:
+        """Return the body of a response wrapped in a ``` or ```markdown fence, or the text unchanged."""
+        match = CODE_FENCE_PATTERN.match(text)
+        return match.group(1).strip() if match else text
+        
     def clean_json_response(self, json_text: str) -> str:
         """Clean up common JSON formatting issues from AI responses."""
-        import re
-        
         # Remove any leading/trailing whitespace
         json_text = json_text.strip()
         
@@ -1709,14 +2893,13 @@ Begin your response with the enhanced note content now:
             json_text = json_text[:json_text.rfind('}') + 1]
         
         # Fix unquoted property names (common issue)
-        json_text = re.sub(r'(\w+):', r'"\1":', json_text)
+        json_text = UNQUOTED_KEY_PATTERN.sub(r'"\1":', json_text)
         
         # Fix single quotes to double quotes
-        json_text = re.sub(r"'([^']*)'", r'"\1"', json_text)
+        json_text = SINGLE_QUOTED_PATTERN.sub(r'"\1"', json_text)
         
         # Remove trailing commas before closing braces/brackets
-        json_text = re.sub(r',\s*}', '}', json_text)
-        json_text = re.sub(r',\s*]', ']', json_text)
+        json_text = TRAILING_COMMA_PATTERN.sub(r'\1', json_text)
         
         # Fix common number/string formatting issues
         lines = json_text.split('\n')
@@ -1744,7 +2927,7 @@ Begin your response with the enhanced note content now:
                         trailing_comma = ''
                     
                     # If value is a number, don't quote it
-                    if re.match(r'^\d+$', value_part.strip()):
+                    if value_part.strip().isdecimal():
                         line = f"{key_part}: {value_part}{trailing_comma}"
                     # If value is already quoted string, fix any internal quote issues
                     elif value_part.startswith('"') and value_part.endswith('"'):
@@ -1759,12 +2942,304 @@ Begin your response with the enhanced note content now:
                         content = content.replace('"', '\\"')
                         line = f"{key_part}: \"{content}\"{trailing_comma}"
             
-            fixed_lines.append(line)
+            fixed_lines.append(line)
+        
+        return '\n'.join(fixed_lines)
+    
+    def content_hash(self, content: str) -> str:
+        """SHA-256 of note content, used as the analysis cache key."""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+        
+    def load_analysis_cache(self):
+        """Load analyses of unchanged notes saved by previous sessions."""
+        if not self.analysis_cache_file.exists():
+            return
+        try:
+            self.analysis_cache = orjson.loads(self.analysis_cache_file.read_bytes())
+        except Exception as e:
+            print(f"Warning: Could not load analysis cache: {e}")
+            self.analysis_cache = {}
+            
+    def save_analysis_cache(self, min_unsaved: int = 1):
+        """Write the analysis cache once at least min_unsaved new entries are pending."""
+        with self.analysis_cache_lock:
+            if self.analysis_cache_unsaved < min_unsaved:
+                return
+            temp_file = self.analysis_cache_file.with_suffix('.tmp')
+            try:
+                # orjson serializes the whole cache several times faster than json, so the lock is held briefly
+                temp_file.write_bytes(orjson.dumps(self.analysis_cache))
+                os.replace(temp_file, self.analysis_cache_file)
+                self.analysis_cache_unsaved = 0
+            except Exception as e:
+                print(f"Warning: Failed to save analysis cache: {e}")
+                
+    def embed_content(self, content: str) -> Optional[np.ndarray]:
+        """Embed note content for the semantic cache. Returns a unit vector or None on failure."""
+        try:
+            result = self.handle_rate_limiting(
+                genai.embed_content,
+                model="models/text-embedding-004",
+                content=content[:2000],
+                task_type="semantic_similarity"
+            )
+            embedding = np.asarray(result['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(embedding)
+            return embedding / norm if norm > 0 else None
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            tqdm.write(f"Warning: Failed to embed content for semantic cache: {e}")
+            return None
+            
+    def embed_contents(self, contents: List[str], batch_size: int = 100) -> np.ndarray:
+        """
+        Embed many notes with batched requests. Returns unit vectors, one row
+        per note; rows for notes that could not be embedded are all zeros.
+        """
+        rows = [None] * len(contents)
+        for start in tqdm(range(0, len(contents), batch_size), desc="Embedding notes"):
+            batch = [content[:2000] for content in contents[start:start + batch_size]]
+            try:
+                result = self.handle_rate_limiting(
+                    genai.embed_content,
+                    model="models/text-embedding-004",
+                    content=batch,
+                    task_type="semantic_similarity"
+                )
+                for offset, embedding in enumerate(result['embedding']):
+                    rows[start + offset] = embedding
+            except Exception as e:
+                tqdm.write(f"Warning: Failed to embed {len(batch)} notes: {e}")
+                
+        dimension = next((len(row) for row in rows if row is not None), 0)
+        embeddings = np.zeros((len(contents), dimension), dtype=np.float32)
+        for index, row in enumerate(rows):
+            if row is not None:
+                embeddings[index] = row
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+        
+    def embed_notes(self, md_files: List[Path]) -> tuple[List[int], np.ndarray]:
+        """
+        Embed the given notes with batched requests and remember each vector so
+        the semantic cache can use it later without a per-note request.
+        Returns the indices of the non-empty notes and their embeddings.
+        """
+        # Embeddings only look at the first 2000 characters, so don't read further
+        contents = [content for _, content in self.read_many(md_files, max_chars=2000)]
+        candidates = [index for index, content in enumerate(contents) if content.strip()]
+        if not candidates:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        embeddings = self.embed_contents([contents[index] for index in candidates])
+        for row, index in enumerate(candidates):
+            if embeddings[row].any():
+                self.precomputed_embeddings[self.content_hash(contents[index])] = embeddings[row]
+        return candidates, embeddings
+        
+    def group_identical_notes(self, md_files: List[Path]):
+        """
+        Find pending notes with exactly the same content (e.g. a web clip saved in two
+        folders). Only the first copy in review order is analyzed in the background;
+        the others get the same verdict from the analysis cache when they come up.
+        Uses the hashes taken by load_vault_knowledge, so no note is read again.
+        """
+        copies_by_hash = {}
+        for file_path in md_files:
+            content_hash = self.note_content_hashes.get(str(file_path))
+            if content_hash is not None:
+                copies_by_hash.setdefault(content_hash, []).append(file_path)
+                
+        groups = [copies for copies in copies_by_hash.values() if len(copies) > 1]
+        for copies in groups:
+            for file_path in copies:
+                self.identical_copies[str(file_path)] = len(copies) - 1
+            self.duplicate_siblings.update(str(file_path) for file_path in copies[1:])
+        if groups:
+            saved = sum(len(copies) - 1 for copies in groups)
+            print(f"♻️ Found {len(groups)} groups of identical notes; reusing one analysis for {saved} duplicates")
+            
+    def cluster_near_duplicates(self, md_files: List[Path]):
+        """
+        Group notes whose embeddings are nearly identical (e.g. daily-note
+        skeletons). The first note of each group in review order is analyzed
+        and the rest reuse its verdict.
+        """
+        print(f"\n👥 Looking for near-duplicate notes among {len(md_files)} files...")
+        candidates, embeddings = self.embed_notes(md_files)
+        if len(candidates) < 2:
+            return
+        threshold = self.config.get("duplicate_cluster_threshold", 0.95)
+        
+        # Greedy leader clustering over blocks of the similarity matrix
+        assigned = np.zeros(len(candidates), dtype=bool)
+        assigned[np.linalg.norm(embeddings, axis=1) == 0] = True
+        block_size = 256
+        for block_start in range(0, len(candidates), block_size):
+            similarities = embeddings[block_start:block_start + block_size] @ embeddings.T
+            for row, similarity in enumerate(similarities):
+                leader = block_start + row
+                if assigned[leader]:
+                    continue
+                members = np.nonzero((similarity >= threshold) & ~assigned)[0]
+                assigned[members] = True
+                assigned[leader] = True
+                if len(members) < 2:
+                    continue
+                cluster_id = len(self.duplicate_cluster_sizes)
+                self.duplicate_cluster_sizes[cluster_id] = len(members)
+                for member in members:
+                    key = str(md_files[candidates[member]])
+                    self.duplicate_clusters[key] = cluster_id
+                    if member != leader:
+                        self.duplicate_siblings.add(key)
+                        
+        print(f"✅ Found {len(self.duplicate_cluster_sizes)} groups covering {len(self.duplicate_clusters)} notes "
+              f"({len(self.duplicate_siblings)} analyses saved)")
+        
+    def semantic_cache_lookup(self, embedding: np.ndarray) -> Optional[Dict]:
+        """Return a cached analysis whose embedding is similar enough to this one, if any."""
+        with self.semantic_lock:
+            if not self.semantic_analyses or self.semantic_embeddings.shape[1] != embedding.shape[0]:
+                return None
+            similarities = self.semantic_embeddings[:len(self.semantic_analyses)] @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.config.get("semantic_cache_threshold", 0.92):
+                return None
+            return dict(self.semantic_analyses[best])
+            
+    def semantic_cache_add(self, embedding: np.ndarray, analysis: Dict):
+        """Remember an analysis so near-duplicate notes can reuse it."""
+        with self.semantic_lock:
+            count = len(self.semantic_analyses)
+            if count and self.semantic_embeddings.shape[1] != embedding.shape[0]:
+                return
+            # Grow the matrix geometrically so adding stays amortized O(1) instead of copying every row each time
+            if count == len(self.semantic_embeddings) or self.semantic_embeddings.shape[1] != embedding.shape[0]:
+                grown = np.zeros((max(64, count * 2), embedding.shape[0]), dtype=np.float32)
+                if count:
+                    grown[:count] = self.semantic_embeddings[:count]
+                self.semantic_embeddings = grown
+            self.semantic_embeddings[count] = embedding
+            self.semantic_analyses.append(dict(analysis))
+            
+    def load_semantic_cache(self):
+        """Load the semantic cache saved by a previous session, if present."""
+        if not self.semantic_cache_file.exists():
+            return
+        try:
+            with np.load(self.semantic_cache_file) as data:
+                self.semantic_embeddings = data['embeddings'].astype(np.float32)
+                self.semantic_analyses = [json.loads(a) for a in data['analyses']]
+        except Exception as e:
+            print(f"Warning: Could not load semantic cache: {e}")
+            self.semantic_embeddings = np.zeros((0, 0), dtype=np.float32)
+            self.semantic_analyses = []
+            
+    def save_semantic_cache(self):
+        """Persist the semantic cache next to the session log."""
+        with self.semantic_lock:
+            if not self.semantic_analyses:
+                return
+            temp_file = self.semantic_cache_file.with_suffix('.npz.tmp')
+            try:
+                with open(temp_file, 'wb') as f:
+                    np.savez(
+                        f,
+                        embeddings=self.semantic_embeddings[:len(self.semantic_analyses)],
+                        analyses=np.array([json.dumps(a) for a in self.semantic_analyses])
+                    )
+                os.replace(temp_file, self.semantic_cache_file)
+            except Exception as e:
+                print(f"Warning: Failed to save semantic cache: {e}")
+    
+    def get_trivial_note_verdict(self, content: str) -> Optional[Dict]:
+        """
+        Score stub notes locally: notes with only YAML frontmatter, only empty
+        headings, or fewer than 50 non-whitespace characters of body. Notes with links, tags, URLs or
+        anything that looks like a credential always go to the AI instead.
+        """
+        frontmatter = FRONTMATTER_PATTERN.match(content) if content.startswith('---') else None
+        body_start = frontmatter.end() if frontmatter else 0
+        # Most notes reach 50 characters within their first few words, so stop counting
+        # there instead of splitting and copying the whole body
+        body_chars = 0
+        for word in NON_WHITESPACE_PATTERN.finditer(content, body_start):
+            body_chars += word.end() - word.start()
+            if body_chars >= 50:
+                if not HEADINGS_ONLY_PATTERN.fullmatch(content, body_start):
+                    return None
+                break
+        body = content[body_start:]
+        if TRIVIAL_NOTE_EXCEPTIONS_PATTERN.search(body):
+            return None
+            
+        return {
+            "score": 1,
+            "reasoning": "Stub note with only frontmatter, headings or a few words of content (scored locally)",
+            "recommendation": "remove"
+        }
+    
+    def load_template_hashes(self):
+        """Hash the notes in the templates folder so unedited copies of them can be recognized."""
+        self.template_hashes = {}
+        self.templates_path = self.vault_path / self.config.get("templates_folder", "Templates")
+        if not self.templates_path.is_dir():
+            return
+        template_files = [Path(entry.path) for entry in self.scan_markdown_entries(self.templates_path)]
+        for template_file, content in self.read_many(template_files):
+            if content.strip():
+                self.template_hashes[self.content_hash(content.strip())] = template_file.stem
+        if self.template_hashes:
+            print(f"📄 Loaded {len(self.template_hashes)} templates from {self.templates_path.name}/")
+            
+    def get_template_copy_verdict(self, file_path: Path, content: str) -> Optional[Dict]:
+        """
+        Score a note that is an exact copy of a template without asking the AI.
+        It gets a middle score so auto-decisions never act on it, and the user decides.
+        """
+        if not self.template_hashes or self.templates_path in file_path.parents:
+            return None
+        template_name = self.template_hashes.get(self.content_hash(content.strip()))
+        if template_name is None:
+            return None
+        return {
+            "score": 5,
+            "reasoning": f"Unmodified copy of the template '{template_name}' with nothing added (detected locally)",
+            "recommendation": "remove"
+        }
         
-        return '\n'.join(fixed_lines)
+    def extract_note_features(self, content: str) -> Dict:
+        """
+        Count structural features of a note locally with precompiled regexes.
+        Each pattern needs a literal marker, so notes without it skip that regex.
+        """
+        return {
+            "wikilinks": len(WIKILINK_PATTERN.findall(content)) if '[[' in content else 0,
+            "tags": len(TAG_PATTERN.findall(content)) if '#' in content else 0,
+            "frontmatter": content.startswith('---') and bool(FRONTMATTER_PATTERN.match(content)),
+            "credentials": bool(SECRET_PATTERN.search(content)),
+            "template": ('{{' in content or '<%' in content) and bool(TEMPLATE_PATTERN.search(content))
+        }
+        
+    def get_feature_verdict(self, features: Dict) -> Optional[Dict]:
+        """Keep notes whose features alone make them valuable (credentials or large hubs)."""
+        if features["credentials"]:
+            return {
+                "score": 9,
+                "reasoning": "Contains credentials or secrets (detected locally), which are critical personal information",
+                "recommendation": "keep"
+            }
+        if features["wikilinks"] > 15:
+            return {
+                "score": 8,
+                "reasoning": f"Hub note with {features['wikilinks']} WikiLinks (detected locally), central to the knowledge network",
+                "recommendation": "keep"
+            }
+        return None
     
-    def analyze_note_relevance(self, file_path: Path, content: str) -> Dict:
-        """Use Gemini to analyze note relevance and provide scoring."""
+    def get_local_analysis(self, file_path: Path, content: str, content_hash: str) -> Optional[Dict]:
+        """Return the analysis of a note that needs no API call, or None if Gemini has to look at it."""
         if not content.strip():
             return {
                 "score": 0,
@@ -1772,162 +3247,118 @@ Begin your response with the enhanced note content now:
                 "recommendation": "remove"
             }
             
+        # Unchanged notes reuse the analysis from a previous run
+        cached = self.analysis_cache.get(content_hash)
+        if cached is not None:
+            return dict(cached)
+            
+        # Stub notes are scored locally without an API call
+        trivial_verdict = self.get_trivial_note_verdict(content)
+        if trivial_verdict is not None:
+            return trivial_verdict
+            
+        # So are notes that are unedited copies of a template
+        return self.get_template_copy_verdict(file_path, content)
+        
+    def analyze_note_relevance(self, file_path: Path, content: str) -> Dict:
+        """Use Gemini to analyze note relevance and provide scoring."""
+        content_hash = self.content_hash(content)
+        local_analysis = self.get_local_analysis(file_path, content, content_hash)
+        if local_analysis is not None:
+            return local_analysis
+            
+        # Features that decide the outcome on their own also skip the API call
+        features = self.extract_note_features(content)
+        feature_verdict = self.get_feature_verdict(features)
+        if feature_verdict is not None:
+            return feature_verdict
+            
+        # Identical notes analyzed at the same time (e.g. copies in the lookahead window) share one request
+        with self.analysis_cache_lock:
+            in_flight = self.analyses_in_flight.get(content_hash)
+            if in_flight is None:
+                self.analyses_in_flight[content_hash] = threading.Event()
+        if in_flight is not None:
+            in_flight.wait()
+            cached = self.analysis_cache.get(content_hash)
+            if cached is not None:
+                return dict(cached)
+            # The other request failed, so try again ourselves
+            return self.analyze_note_relevance(file_path, content)
+            
+        try:
+            return self.request_note_analysis(file_path, content, content_hash, features)
+        finally:
+            with self.analysis_cache_lock:
+                self.analyses_in_flight.pop(content_hash).set()
+                
+    def request_note_analysis(self, file_path: Path, content: str, content_hash: str, features: Dict) -> Dict:
+        """Analyze a note with the semantic cache or Gemini and record the result in the analysis cache."""
+        # Reuse the analysis of a near-duplicate note when the semantic cache is on
+        embedding = None
+        if self.config.get("semantic_cache_enabled", False):
+            embedding = self.precomputed_embeddings.get(self.content_hash(content[:2000]))
+            if embedding is None:
+                embedding = self.embed_content(content)
+            if embedding is not None:
+                cached = self.semantic_cache_lookup(embedding)
+                if cached is not None:
+                    cached['reasoning'] = f"{cached['reasoning']} (reused from a near-duplicate note)"
+                    return cached
+            
         # Get vault context for comparative analysis
         vault_context = self.get_vault_context_for_analysis(file_path)
         
-        prompt = f"""
-Analyze this Obsidian note and provide a relevance assessment compared to the existing vault knowledge.
-
-File: {file_path.name}
-Path: {file_path.relative_to(self.vault_path)}
-
-Content:
-{content[:2000]}...
-
-{vault_context}
-
-Please provide:
-1. A relevance score from 0-10 where:
-   - 0-2: Poor quality, redundant with existing notes, or no unique value (should delete)
-   - 3-4: Low value compared to existing knowledge, adds little new information
-   - 5-6: Moderate value, has some unique content but could be improved
-   - 7-8: High value, provides useful information not well covered elsewhere
-   - 9-10: Essential content, unique and valuable knowledge
-
-2. Brief reasoning for the score
-3. Recommendation: "remove" (0-4), "enhance" (5-7), or "keep" (8-10)
-
-IMPORTANT: Base the REMOVE recommendation on whether this note adds value compared to your existing knowledge base. Consider:
-- Does this note contain information already covered better in other notes?
-- Is this note of poor quality compared to similar notes in the vault?
-- Does this note provide unique insights or information not found elsewhere?
-- Would removing this note result in any loss of unique knowledge?
-
-Consider factors like:
-- Content quality and depth
-- Uniqueness of information
-- Practical utility
-- Recency and relevance
-- Whether it's a template, reference, or personal note
-
-**CRITICAL SCORING RULES - PERSONAL KNOWLEDGE IS MOST VALUABLE:**
-
-**MAXIMUM VALUE (+4-5 points each) - Core "Second Brain" Content:**
-- **Personal financial data** (401k, investments, portfolio tracking, bank info, taxes): +5 points (irreplaceable personal records)
-- **Personal medical/health records** (symptoms, treatments, doctor visits, health tracking): +5 points (important health history)
-- **Original thoughts and insights** (personal reflections, unique ideas, "aha moments"): +4 points (irreplaceable creativity)
-- **Personal learning synthesis** (combining multiple sources with your own understanding): +4 points (knowledge building)
-- **Life experiences and stories** (travel, relationships, major events, lessons learned): +4 points (personal history)
-- **API keys, passwords, credentials, secrets**: +5 points (critical security info)
-
-**HIGH VALUE (+3-4 points each) - Personal Development & Systems:**
-- **Personal project tracking** (goals, habits, progress logs, reviews): +4 points (self-improvement data)
-- **Career development** (job history, performance reviews, salary info, career planning): +4 points (career tracking)
-- **Personal workflows and systems** (custom templates, processes you created): +3 points (reusable personal systems)
-- **Book notes with personal commentary** (highlights + your thoughts and connections): +3 points (learning with insight)
-- **Meeting notes with personal action items** (decisions you made, follow-ups): +3 points (personal responsibility tracking)
-- **Time-series data/tracking** (charts, logs, measurements over time): +3 points (historical value)
-- **Daily notes and journal entries** (personal reflections, mood, daily planning): +3 points (life documentation)
-
-**SOLID VALUE (+2-3 points each) - Knowledge Network & Organization:**
-- **Hub/index notes** with many outgoing links (MOCs - Maps of Content): +3 points (central to knowledge network)
-- **Multiple WikiLinks [[note name]]** (3+ internal links): +3 points (highly interconnected knowledge)
-- **Tags and metadata** (#tag, YAML frontmatter): +3 points (organized knowledge structure)
-- **Personal contacts/relationships** (addresses, phone numbers, personal notes about people): +3 points (relationship management)
-- **Personal research with insights** (your questions, hypotheses, conclusions): +2 points (original investigation)
-- **Project planning and documentation** (your projects, not work assignments): +2 points (personal organization)
-- **Obsidian links [[note name]]** connecting to other notes: +2 points (shows interconnectedness)
-- **Personal definitions and explanations** (your way of understanding complex topics): +2 points (personal knowledge building)
-
-**MINOR VALUE (+1-2 points each) - Supporting Content:**
-- **Learning notes with some personal insight** (courses, tutorials with your notes): +2 points (active learning)
-- **Reference materials you curated** (useful links, resources you collected): +1 point (personal curation)
-- **Templates from others you modified** (adapted to your needs): +1 point (personalization)
-- **Event notes** (conferences, talks you attended with takeaways): +1 point (learning documentation)
-
-**MAJOR PENALTIES (-3-4 points each) - Content That Should Be Removed:**
-- **Copy-pasted content without personal input**: -4 points (not your thoughts, just storage)
-- **Information already covered better in other vault notes**: -4 points (redundant, inferior duplicate)
-- **Easily recreated from Google/Wikipedia**: -4 points (generic information, not personal knowledge)
-- **Temporary/outdated task lists** (completed todos, old project notes): -3 points (served their purpose)
-- **Duplicate information** (same content exists in multiple places): -4 points (knowledge fragmentation, keep the better version)
-- **Empty placeholder notes** (titles with no content, "TODO" notes never filled): -4 points (intellectual debt)
-- **Poor quality compared to similar notes in vault**: -3 points (inferior version of existing knowledge)
-
-**MODERATE PENALTIES (-2-3 points each) - Reduced Value Content:**
-- **No WikiLinks or tags**: -3 points (isolated from knowledge network, defeats Obsidian's purpose)
-- **No Obsidian links [[note name]]**: -3 points (not connected to other notes, missing knowledge graph value)
-- **No tags or metadata**: -2 points (poor organization, hard to find and categorize)
-- **Outdated technology/software notes** (unless personal setup): -2 points (temporal relevance lost)
-- **Generic templates from internet** (unchanged, not personalized): -2 points (not your system)
-- **Pure link collections** (no commentary, context, or personal organization): -2 points (no added value)
-- **Work-only content** (company-specific info with no personal insight): -2 points (less relevant to personal knowledge)
-
-**REMEMBER: Personal = Valuable. WikiLinks/Tags = Essential. Any note containing personal data, tracking, or financial information should score 7+ points. Notes with WikiLinks [[note name]] and tags #tag are the backbone of your knowledge network and should be strongly favored.**
-
-CRITICAL: Respond with ONLY valid JSON in exactly this format (no additional text, no markdown formatting):
-{{
-    "score": 7,
-    "reasoning": "Your explanation here",
-    "recommendation": "enhance"
-}}
-
-JSON REQUIREMENTS:
-- Use double quotes for all strings
-- Score must be a number 0-10 (no quotes around numbers)
-- Recommendation must be exactly one of: remove, enhance, keep
-- No trailing commas
-- No additional fields or text outside the JSON object
-"""
+        # Tell the model when it only sees the start of the note so it doesn't penalize the cut
+        excerpt = self.truncate_to_tokens(content, ANALYSIS_CONTENT_TOKENS)
+        if len(excerpt) < len(content):
+            content_label = f"Content (first {ANALYSIS_CONTENT_TOKENS} tokens only; the note continues beyond this excerpt)"
+            excerpt += "..."
+        else:
+            content_label = "Content"
+            
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format_map({
+            **self.get_note_prompt_fields(file_path, features),
+            "content_label": content_label,
+            "content": excerpt,
+            "vault_context": vault_context
+        })
 
         try:
             # Use rate limiting handler for the API call
-            response = self.handle_rate_limiting(self.model.generate_content, prompt)
-            # Extract JSON from response
+            response = self.generate_analysis(prompt)
+            # Extract JSON from response (the schema makes this plain JSON in practice)
             response_text = response.text.strip()
+            result = self.extract_json_object(response_text)
             
-            # Remove markdown code blocks if present
-            if response_text.startswith('```json'):
-                response_text = response_text.split('```json')[1].split('```')[0]
-            elif response_text.startswith('```'):
-                response_text = response_text.split('```')[1].split('```')[0]
-            
-            # Clean up the JSON response
-            response_text = response_text.strip()
-            
-            # Try to parse JSON directly first
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError:
+            if result is None:
                 # If direct parsing fails, try cleaning and parsing again
                 try:
                     cleaned_response = self.clean_json_response(response_text)
-                    result = json.loads(cleaned_response)
-                except json.JSONDecodeError:
+                    result = orjson.loads(cleaned_response)
+                except orjson.JSONDecodeError:
                     # If all JSON parsing fails, use fallback regex parser
                     tqdm.write(f"JSON parsing failed for {file_path.name}, using fallback parser")
                     result = self.parse_ai_response_fallback(response_text)
             
             # Validate the result has required fields
-            if not all(key in result for key in ['score', 'reasoning', 'recommendation']):
+            if not isinstance(result, dict) or not all(key in result for key in ['score', 'reasoning', 'recommendation']):
                 # Try fallback parser if fields are missing
                 result = self.parse_ai_response_fallback(response_text)
                 
-            # Validate score is in valid range
-            if not isinstance(result['score'], (int, float)) or not (0 <= result['score'] <= 10):
-                result['score'] = 5  # Default to middle score
+            self.validate_analysis(result)
+            
+            if embedding is not None:
+                self.semantic_cache_add(embedding, result)
                 
-            # Validate recommendation is valid
-            if result['recommendation'] not in ['remove', 'enhance', 'keep']:
-                if result['score'] <= 4:
-                    result['recommendation'] = 'remove'
-                elif result['score'] <= 7:
-                    result['recommendation'] = 'enhance'
-                else:
-                    result['recommendation'] = 'keep'
+            with self.analysis_cache_lock:
+                self.analysis_cache[content_hash] = dict(result)
+                self.analysis_cache_unsaved += 1
             
             return result
             
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             tqdm.write(f"Error analyzing {file_path}: {e}")
             return {
@@ -1936,111 +3367,237 @@ JSON REQUIREMENTS:
                 "recommendation": "enhance"
             }
             
-    def display_analysis(self, file_path: Path, analysis: Dict, content: str):
-        """Display the analysis results to the user."""
-        print("\n" + "="*80)
-        clickable_name = self.make_clickable_path(file_path)
-        print(f"📄 File: {Fore.CYAN}{clickable_name}{Style.RESET_ALL}")
-        print(f"📁 Path: {file_path.relative_to(self.vault_path)}")
-        print(f"📊 Size: {len(content):,} characters")
-        
-        # Color-coded relevance score
-        score = analysis['score']
-        if score <= 2:
-            color = Fore.RED
-        elif score <= 4:
-            color = Fore.YELLOW
-        elif score <= 6:
-            color = Fore.CYAN
-        elif score <= 8:
-            color = Fore.GREEN
-        else:
-            color = Fore.LIGHTGREEN_EX
-            
-        print(f"⭐ Relevance Score: {color}{score}/10{Style.RESET_ALL}")
-        
-        # Show formatted preview
-        print(f"\n{Fore.LIGHTBLUE_EX}📖 Preview:{Style.RESET_ALL}")
-        preview = self.format_markdown_preview(content, 600)
-        print(preview)
-        
-        print(f"\n{Fore.LIGHTMAGENTA_EX}🤖 AI Reasoning:{Style.RESET_ALL}")
-        print(f"  {analysis['reasoning']}")
-        
-        # Color-coded AI recommendation
-        recommendation = analysis['recommendation'].upper()
-        if recommendation == 'REMOVE':
-            rec_color = Fore.RED
-            emoji = "🗑️"
-        elif recommendation == 'ENHANCE':
-            rec_color = Fore.YELLOW
-            emoji = "✨"
-        else:  # KEEP
-            rec_color = Fore.GREEN
-            emoji = "✅"
-            
-        print(f"\n{emoji} AI Recommendation: {rec_color}{recommendation}{Style.RESET_ALL}")
-        print("="*80)
-        
-    def display_analysis_with_tqdm(self, file_path: Path, analysis: Dict, content: str):
-        """Display the analysis results using tqdm.write to avoid interfering with progress bar."""
-        tqdm.write("\n" + "="*80)
-        clickable_name = self.make_clickable_path(file_path)
-        tqdm.write(f"📄 File: {Fore.CYAN}{clickable_name}{Style.RESET_ALL}")
-        tqdm.write(f"📁 Path: {file_path.relative_to(self.vault_path)}")
-        tqdm.write(f"📊 Size: {len(content):,} characters")
+    def get_note_prompt_fields(self, file_path: Path, features: Dict) -> Dict:
+        """Fields shared by the single-note and group analysis prompts."""
+        return {
+            "name": file_path.name,
+            "path": self.get_relative_path(file_path),
+            "wikilinks": features['wikilinks'],
+            "tags": features['tags'],
+            "frontmatter": 'yes' if features['frontmatter'] else 'no',
+            "credentials": 'yes' if features['credentials'] else 'no',
+            "template": 'yes' if features['template'] else 'no'
+        }
         
-        # Color-coded relevance score
-        score = analysis['score']
-        if score <= 2:
-            color = Fore.RED
-        elif score <= 4:
-            color = Fore.YELLOW
-        elif score <= 6:
-            color = Fore.CYAN
-        elif score <= 8:
-            color = Fore.GREEN
-        else:
-            color = Fore.LIGHTGREEN_EX
+    def validate_analysis(self, result: Dict) -> Dict:
+        """Clamp an AI analysis to a valid score and recommendation, in place."""
+        # Validate score is in valid range
+        if not isinstance(result['score'], (int, float)) or not (0 <= result['score'] <= 10):
+            result['score'] = 5  # Default to middle score
             
-        tqdm.write(f"⭐ Relevance Score: {color}{score}/10{Style.RESET_ALL}")
+        # Validate recommendation is valid
+        if result['recommendation'] not in ['remove', 'enhance', 'keep']:
+            if result['score'] <= 4:
+                result['recommendation'] = 'remove'
+            elif result['score'] <= 7:
+                result['recommendation'] = 'enhance'
+            else:
+                result['recommendation'] = 'keep'
+        return result
         
-        # Show formatted preview
-        tqdm.write(f"\n{Fore.LIGHTBLUE_EX}📖 Preview:{Style.RESET_ALL}")
-        preview = self.format_markdown_preview(content, 600)
-        tqdm.write(preview)
+    def request_group_analysis(self, notes: List[tuple]) -> Dict[int, Dict]:
+        """
+        Analyze several small notes with one request. notes holds (file_path, content,
+        content_hash, features) tuples; returns their analyses by position. Notes the
+        response leaves out (or a failed request) are simply missing from the result.
+        """
+        sections = []
+        for index, (file_path, content, _, features) in enumerate(notes, 1):
+            sections.append(GROUP_NOTE_SECTION_TEMPLATE.format_map({
+                **self.get_note_prompt_fields(file_path, features),
+                "index": index,
+                "content": content,
+                "vault_context": self.get_vault_context_for_analysis(file_path)
+            }))
+        prompt = GROUP_ANALYSIS_PROMPT_TEMPLATE.format_map({"count": len(notes), "notes": "".join(sections)})
         
-        tqdm.write(f"\n{Fore.LIGHTMAGENTA_EX}🤖 AI Reasoning:{Style.RESET_ALL}")
-        tqdm.write(f"  {analysis['reasoning']}")
+        try:
+            response = self.generate_analysis(prompt, group=True)
+            items = orjson.loads(response.text)
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            tqdm.write(f"Group analysis of {len(notes)} notes failed, analyzing them one by one: {e}")
+            return {}
+            
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not all(key in item for key in ['index', 'score', 'reasoning', 'recommendation']):
+                continue
+            position = item['index'] - 1 if isinstance(item['index'], int) else -1
+            if not 0 <= position < len(notes) or position in results:
+                continue
+            result = self.validate_analysis({key: item[key] for key in ['score', 'reasoning', 'recommendation']})
+            results[position] = result
+            with self.analysis_cache_lock:
+                self.analysis_cache[notes[position][2]] = dict(result)
+                self.analysis_cache_unsaved += 1
+        return results
+        
+    def analyze_note_group(self, file_paths: List[Path], content_futures: List, note_futures: List[Future]):
+        """
+        Worker for batch analysis of small notes: notes that still need the AI after the
+        local checks are sent together in one request, and each note's future gets its
+        (analysis, content) as soon as it is known. Notes missing from the group response
+        fall back to a request of their own.
+        """
+        try:
+            pending = []
+            for file_path, content_future, note_future in zip(file_paths, content_futures, note_futures):
+                content = content_future.result()[0]
+                content_hash = self.content_hash(content)
+                analysis = self.get_local_analysis(file_path, content, content_hash)
+                features = None
+                if analysis is None:
+                    features = self.extract_note_features(content)
+                    analysis = self.get_feature_verdict(features)
+                if analysis is None:
+                    pending.append((file_path, content, content_hash, features, note_future))
+                else:
+                    self.resolve_future(note_future, (analysis, content))
+                    
+            results = self.request_group_analysis([note[:4] for note in pending]) if len(pending) > 1 else {}
+            for position, (file_path, content, _, _, note_future) in enumerate(pending):
+                analysis = results.get(position)
+                if analysis is None:
+                    analysis = self.analyze_note_relevance(file_path, content)
+                self.resolve_future(note_future, (analysis, content))
+        except Exception as e:
+            for note_future in note_futures:
+                if not note_future.done():
+                    try:
+                        note_future.set_exception(e)
+                    except InvalidStateError:
+                        pass
+                        
+    def resolve_future(self, future: Future, result):
+        """Set a future's result unless it was cancelled in the meantime."""
+        try:
+            future.set_result(result)
+        except InvalidStateError:
+            pass
+            
+    def batch_analyze_notes(self, md_files: List[Path]):
+        """
+        Queue every note for analysis with concurrent API requests. The review
+        starts right away and picks up each result as it arrives, in review order.
+        Small notes are packed into shared requests of up to small_note_group_size notes.
+        """
+        max_workers = max(1, self.config.get("batch_workers", 4))
+        print(f"\n📦 Batch analyzing {len(md_files)} notes in the background ({max_workers} concurrent requests)...")
         
-        # Color-coded AI recommendation
-        recommendation = analysis['recommendation'].upper()
-        if recommendation == 'REMOVE':
-            rec_color = Fore.RED
-            emoji = "🗑️"
-        elif recommendation == 'ENHANCE':
-            rec_color = Fore.YELLOW
-            emoji = "✨"
-        else:  # KEEP
-            rec_color = Fore.GREEN
-            emoji = "✅"
+        group_count = self.queue_analyses(md_files)
+        if group_count:
+            max_chars = self.config.get("small_note_max_chars", 500)
+            print(f"   Packed small notes (≤{max_chars} characters) into {group_count} shared requests")
+            
+    def queue_analyses(self, md_files: List[Path]) -> int:
+        """
+        Queue background analyses for notes that have none yet, packing small notes
+        into shared requests of up to small_note_group_size notes.
+        Returns the number of shared requests queued.
+        """
+        group_size = self.config.get("small_note_group_size", 8)
+        # Grouped notes skip the per-note embedding lookup, so keep them apart when the semantic cache is on
+        if group_size < 2 or self.config.get("semantic_cache_enabled", False):
+            self.prefetch_analyses(md_files)
+            return 0
+            
+        if self.analysis_executor is None:
+            self.analysis_executor = ThreadPoolExecutor(max_workers=max(1, self.config.get("batch_workers", 4)))
+        max_chars = self.config.get("small_note_max_chars", 500)
+        groups = [[]]
+        for file_path in md_files:
+            key = str(file_path)
+            if key in self.analysis_futures or key in self.duplicate_siblings:
+                continue
+            try:
+                # A note has at most as many characters as bytes
+                is_small = file_path.stat().st_size <= max_chars
+            except OSError:
+                is_small = False
+            if not is_small:
+                self.prefetch_analyses([file_path])
+                continue
+            groups[-1].append(file_path)
+            if len(groups[-1]) == group_size:
+                self.submit_note_group(groups[-1])
+                groups.append([])
+        if groups[-1]:
+            self.submit_note_group(groups[-1])
+        else:
+            groups.pop()
+        return len(groups)
             
-        tqdm.write(f"\n{emoji} AI Recommendation: {rec_color}{recommendation}{Style.RESET_ALL}")
-        tqdm.write("="*80)
+    def submit_note_group(self, group: List[Path]):
+        """Queue a group of small notes for one shared analysis request."""
+        self.prefetch_file_contents(group)
+        note_futures = [Future() for _ in group]
+        for file_path, note_future in zip(group, note_futures):
+            self.analysis_futures[str(file_path)] = note_future
+        self.analysis_executor.submit(
+            self.analyze_note_group, group, [self.content_futures[str(file_path)] for file_path in group], note_futures
+        )
+            
+    def get_note_labels(self, file_path: Path, content: str) -> tuple[str, str, str]:
+        """
+        Return the clickable link, relative path and formatted size shown for a note.
+        The last note's labels are kept, since its analysis and full content are often
+        shown several times while the user decides.
+        """
+        cached_path, cached_content, labels = self.note_labels_cache
+        if cached_path != file_path or cached_content is not content:
+            labels = (self.make_clickable_path(file_path), self.get_relative_path(file_path), f"{len(content):,}")
+            self.note_labels_cache = (file_path, content, labels)
+        return labels
+        
+    def format_analysis(self, file_path: Path, analysis: Dict, content: str) -> str:
+        """Build the analysis block for one file as a single string."""
+        score = analysis['score']
+        if isinstance(score, int) and 0 <= score <= 10:
+            score_label = SCORE_LABELS[score]
+        else:
+            score_label = f"{SCORE_COLORS[min(10, max(0, math.ceil(score)))]}{score}/10{Style.RESET_ALL}"
+        emoji, rec_color = RECOMMENDATION_STYLES.get(analysis['recommendation'], RECOMMENDATION_STYLES['keep'])
+        
+        link, rel_path, size = self.get_note_labels(file_path, content)
+        parts = [
+            SEPARATOR_LINE,
+            f"📄 File: {Fore.CYAN}{link}{Style.RESET_ALL}",
+            f"📁 Path: {rel_path}",
+            f"📊 Size: {size} characters",
+        ]
+        identical_copies = self.identical_copies.get(str(file_path))
+        if identical_copies:
+            parts.append(f"♻️ Identical copies: {identical_copies} other notes have exactly this content")
+        cluster_id = self.duplicate_clusters.get(str(file_path))
+        if cluster_id is not None:
+            parts.append(f"👥 Near-duplicates: {self.duplicate_cluster_sizes[cluster_id] - 1} other notes look nearly identical")
+        parts += [
+            f"⭐ Relevance Score: {score_label}",
+            f"\n{Fore.LIGHTBLUE_EX}📖 Preview:{Style.RESET_ALL}",
+            self.format_markdown_preview(content, 600),
+            f"\n{Fore.LIGHTMAGENTA_EX}🤖 AI Reasoning:{Style.RESET_ALL}",
+            f"  {analysis['reasoning']}",
+            f"\n{emoji} AI Recommendation: {rec_color}{analysis['recommendation'].upper()}{Style.RESET_ALL}",
+            "="*80
+        ]
+        return '\n'.join(parts)
+        
+    def display_analysis(self, file_path: Path, analysis: Dict, content: str):
+        """Display the analysis results using tqdm.write to avoid interfering with progress bar."""
+        tqdm.write(self.format_analysis(file_path, analysis, content))
         
     def get_user_decision(self, analysis: Dict) -> str:
         """Get user decision on whether to keep or delete the file."""
+        # The full menu is shown once per session; after that a one-line prompt is enough
+        if not self.decision_menu_shown:
+            sys.stdout.write(DECISION_MENU)
+            self.decision_menu_shown = True
+        sys.stdout.write(DECISION_PROMPT)
+        sys.stdout.flush()
+        
         while True:
-            print("\nWhat would you like to do?")
-            print("  [k] Keep this file (default)")
-            print("  [d] Delete this file")
-            print("  [v] View entire note content")
-            print("  [e] Enhance/Expand this note with AI")
-            print("  [s] Skip for now")
-            print("  [q] Quit the review process")
-            
-            print("\nPress a key (k/d/v/s/e/q) or Enter for default (keep): ", end="", flush=True)
-            
             try:
                 choice = getch()
                 
@@ -2048,88 +3605,140 @@ JSON REQUIREMENTS:
                 if choice in ['\r', '\n', '']:
                     print("k (default)")
                     return 'keep'
-                elif choice == 'k':
-                    print("k")
-                    return 'keep'
-                elif choice == 'd':
-                    print("d")
-                    return 'delete'
-                elif choice == 'v':
-                    print("v")
-                    return 'view'
-                elif choice == 'e':
-                    print("e")
-                    return 'enhance'
-                elif choice == 's':
-                    print("s")
-                    return 'skip'
-                elif choice == 'q':
-                    print("q")
-                    return 'quit'
+                elif choice in DECISION_KEYS:
+                    print(choice)
+                    return DECISION_KEYS[choice]
+                elif choice == '?':
+                    sys.stdout.write("?\n" + DECISION_MENU + DECISION_PROMPT)
+                    sys.stdout.flush()
                 else:
-                    print(f"{choice} - Invalid choice. Please press k, d, v, s, e, q, or Enter for default (keep).")
+                    sys.stdout.write(
+                        f"{choice} - Invalid choice. Please press k, d, v, s, e, q, or Enter for default (keep).\n"
+                        + DECISION_MENU + DECISION_PROMPT
+                    )
+                    sys.stdout.flush()
             except (KeyboardInterrupt, EOFError):
                 print("\nq")
                 return 'quit'
                 
+    def format_full_content(self, content: str) -> str:
+        """
+        Format a whole note for the full-content view: tables, then bold and italic
+        across the entire text. The last result is kept, since the view is often
+        opened more than once for the same note.
+        """
+        if self.formatted_content_cache[0] is not content:
+            formatted_content = self.apply_inline_formatting(self.format_markdown_table(content))
+            self.formatted_content_cache = (content, formatted_content)
+        return self.formatted_content_cache[1]
+        
+    def format_full_content_view(self, file_path: Path, content: str) -> str:
+        """Build the full-content view for one file as a single string."""
+        link, rel_path, size = self.get_note_labels(file_path, content)
+        return '\n'.join([
+            SEPARATOR_LINE,
+            f"📄 FULL CONTENT: {Fore.CYAN}{link}{Style.RESET_ALL}",
+            f"📁 Path: {rel_path}",
+            f"📊 Size: {size} characters",
+            "="*80,
+            self.format_full_content(content),
+            "="*80,
+            f"{Fore.GREEN}📝 End of file content{Style.RESET_ALL}",
+            "="*80
+        ])
+        
     def display_full_content(self, file_path: Path, content: str):
-        """Display the full content of a note with better formatting."""
-        print("\n" + "="*80)
-        clickable_name = self.make_clickable_path(file_path)
-        print(f"📄 FULL CONTENT: {Fore.CYAN}{clickable_name}{Style.RESET_ALL}")
-        print(f"📁 Path: {file_path.relative_to(self.vault_path)}")
-        print(f"📊 Size: {len(content):,} characters")
-        print("="*80)
-        
-        # Format the content for better readability
-        formatted_content = self.format_markdown_table(content)
-        # Apply bold and italic formatting to the entire content
-        formatted_content = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', formatted_content)
-        formatted_content = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', formatted_content)
-        print(formatted_content)
-        
-        print("="*80)
-        print(f"{Fore.GREEN}📝 End of file content{Style.RESET_ALL}")
-        print("="*80)
-        
-    def display_full_content_with_tqdm(self, file_path: Path, content: str):
         """Display the full content of a note using tqdm.write."""
-        tqdm.write("\n" + "="*80)
-        clickable_name = self.make_clickable_path(file_path)
-        tqdm.write(f"📄 FULL CONTENT: {Fore.CYAN}{clickable_name}{Style.RESET_ALL}")
-        tqdm.write(f"📁 Path: {file_path.relative_to(self.vault_path)}")
-        tqdm.write(f"📊 Size: {len(content):,} characters")
-        tqdm.write("="*80)
-        
-        # Format the content for better readability
-        formatted_content = self.format_markdown_table(content)
-        # Apply bold and italic formatting to the entire content
-        formatted_content = re.sub(r'\*\*([^*]+)\*\*', rf'{Style.BRIGHT}\1{Style.NORMAL}', formatted_content)
-        formatted_content = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', rf'\033[3m\1\033[0m', formatted_content)
-        tqdm.write(formatted_content)
-        
-        tqdm.write("="*80)
-        tqdm.write(f"{Fore.GREEN}📝 End of file content{Style.RESET_ALL}")
-        tqdm.write("="*80)
+        tqdm.write(self.format_full_content_view(file_path, content))
+        
+    def is_minor_enhancement(self, content: str, enhanced_content: str) -> bool:
+        """True when an enhanced note kept the original's opening and about the same length."""
+        if not content:
+            return False
+        ratio = len(enhanced_content) / len(content)
+        return (MINOR_ENHANCEMENT_MIN_RATIO < ratio < MINOR_ENHANCEMENT_MAX_RATIO
+                and enhanced_content[:MINOR_ENHANCEMENT_PREFIX_CHARS] == content[:MINOR_ENHANCEMENT_PREFIX_CHARS])
+        
+    def record_decision(self, file_path: Path, decision: str, is_created_atomic_note: bool = False):
+        """
+        Apply a final decision ('keep', 'delete', 'skip', or 'quit' after an enhancement was saved)
+        to a note, mark it processed and save progress.
+        """
+        recorded = decision in ('keep', 'skip')
+        if decision == 'keep':
+            self.kept_files.append(file_path)
+        elif decision == 'delete' and self.delete_file(file_path):
+            self.deleted_files.append(file_path)
+            recorded = True
+        if recorded and is_created_atomic_note:
+            self.atomic_notes_reviewed.append(file_path.stem)
+        self.mark_processed(file_path)
+        self.save_progress_periodically()
+        
+    def format_reanalysis_header(self, progress_line: str, old_score, new_score) -> str:
+        """Build the progress and score-change lines shown above the analysis of an enhanced note."""
+        return (
+            f"{progress_line}\n\n"
+            f"{Fore.GREEN}🎉 ENHANCED NOTE RE-ANALYSIS:{Style.RESET_ALL}\n"
+            f"📈 Score improved from {old_score}/10 to {new_score}/10 ({'+' if new_score > old_score else ''}{new_score - old_score} points)\n"
+        )
         
     def delete_file(self, file_path: Path) -> bool:
-        """Delete a file and return success status."""
+        """
+        Queue a file for deletion on a background thread and return immediately.
+        Failures are reported and taken out of deleted_files by wait_for_pending_deletes.
+        """
+        if self.delete_executor is None:
+            self.delete_executor = ThreadPoolExecutor(max_workers=1)
+        self.delete_executor.submit(self.unlink_file, file_path)
+        print(f"Queued for deletion: {file_path}")
+        return True
+        
+    def unlink_file(self, file_path: Path):
+        """
+        Move a file to the system trash (or remove it when trash is disabled or
+        unavailable), recording failures for wait_for_pending_deletes.
+        Any other trash error is recorded too, instead of deleting the note for good.
+        """
         try:
-            file_path.unlink()
-            print(f"Deleted: {file_path}")
-            return True
+            if self.config.get("move_to_trash", True):
+                try:
+                    send2trash(str(file_path))
+                    tqdm.write(f"Deleted: {file_path}")
+                    return
+                except TrashPermissionError:
+                    # No usable trash (e.g. some network mounts), delete outright
+                    tqdm.write(f"⚠️ No trash available for {file_path.name}, deleting it permanently")
+            os.unlink(str(file_path))
+            tqdm.write(f"Deleted: {file_path}")
         except Exception as e:
-            print(f"Failed to delete {file_path}: {e}")
-            return False
+            self.failed_deletes.append((file_path, e))
             
+    def wait_for_pending_deletes(self):
+        """
+        Block until queued deletions finish. Failed ones are dropped from deleted_files
+        and processed_files, so the note still on disk is offered again next session.
+        """
+        if self.delete_executor is not None:
+            self.delete_executor.shutdown(wait=True)
+            self.delete_executor = None
+        while self.failed_deletes:
+            file_path, error = self.failed_deletes.pop(0)
+            print(f"Failed to delete {file_path}: {error}")
+            if file_path in self.deleted_files:
+                self.deleted_files.remove(file_path)
+            self.processed_files.pop(self.progress_key(file_path), None)
+            
+
     def save_session_log(self):
         """Save a log of the review session."""
+        self.wait_for_pending_deletes()
         log_data = {
             "session_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "vault_path": str(self.vault_path),
-            "deleted_files": [str(f) for f in self.deleted_files],
-            "kept_files": [str(f) for f in self.kept_files],
-            "enhanced_files": [str(f) for f in self.enhanced_files],
+            "deleted_files": self.deleted_files,
+            "kept_files": self.kept_files,
+            "enhanced_files": self.enhanced_files,
             "atomic_notes_created": self.atomic_notes_created,
             "atomic_notes_reviewed": getattr(self, 'atomic_notes_reviewed', []),
             "total_deleted": len(self.deleted_files),
@@ -2141,14 +3750,18 @@ JSON REQUIREMENTS:
         
         log_file = self.vault_path / "vault_review_log.json"
         try:
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            # default=str serializes the Path entries directly
+            log_file.write_bytes(orjson.dumps(log_data, option=orjson.OPT_INDENT_2, default=str))
             print(f"\nSession log saved to: {log_file}")
         except Exception as e:
             print(f"Failed to save log: {e}")
             
+        self.save_analysis_cache()
+        self.save_semantic_cache()
+            
     def review_vault(self):
         """Main method to review the entire vault."""
+        self.stop_event.clear()
         print("Starting Obsidian Vault Review")
         print("="*50)
         
@@ -2161,7 +3774,7 @@ JSON REQUIREMENTS:
             else:
                 print("Starting fresh review session...")
                 # Reset progress
-                self.processed_files = set()
+                self.processed_files = {}
                 self.deleted_files = []
                 self.kept_files = []
                 self.enhanced_files = []
@@ -2183,6 +3796,7 @@ JSON REQUIREMENTS:
         
         # Find all markdown files (respects subfolder configuration set above)
         md_files = self.find_markdown_files()
+        self.load_template_hashes()
         
         # Initialize queue for newly created atomic notes
         self.new_atomic_notes_queue = []
@@ -2208,6 +3822,26 @@ JSON REQUIREMENTS:
         # Save initial progress to create the file
         self.save_progress()
         
+        # Exact copies share one analysis through the analysis cache
+        self.group_identical_notes(md_files)
+        
+        # Group near-duplicates first so only one note per group is sent for analysis
+        if self.config.get("duplicate_clustering_enabled", False):
+            self.cluster_near_duplicates(md_files)
+        elif self.config.get("semantic_cache_enabled", False):
+            # Embed everything in batches up front instead of one request per note
+            print(f"\n🧭 Embedding {len(md_files)} notes for the semantic cache...")
+            self.embed_notes(md_files)
+        
+        # Queue everything for analysis so the review loop rarely waits on the API
+        if self.config.get("batch_analysis_enabled", False):
+            self.batch_analyze_notes(md_files)
+            
+        # Without a user in the loop, analyze further ahead so a slow note never leaves the workers idle
+        analysis_lookahead = self.config.get("analysis_lookahead", 8)
+        if self.is_fully_automatic():
+            analysis_lookahead = max(analysis_lookahead, 4 * self.config.get("batch_workers", 4))
+        
         # Clear screen to start fresh
         self.clear_screen()
         print("🚀 Starting Obsidian Vault Review")
@@ -2223,12 +3857,14 @@ JSON REQUIREMENTS:
             desc="Reviewing files",
             initial=processed_count,
             unit="files",
+            mininterval=0.5,  # Limit redraws; the bar is repainted on the next update anyway
             bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} files [{elapsed}<{remaining}, {rate_fmt}]"
         )
         
         try:
             # Convert to list to allow dynamic additions
             files_to_process = list(md_files)
+            queued_paths = set(files_to_process)  # O(1) membership checks for the queue
             i = 0
             
             while i < len(files_to_process):
@@ -2243,15 +3879,26 @@ JSON REQUIREMENTS:
                 # Show progress (use current list length for dynamic total)
                 current_total = len(files_to_process) + len(self.processed_files)
                 files_completed = processed_count + i - 1
-                tqdm.write(f"Progress: {files_completed}/{current_total} files processed ({files_completed/current_total*100:.1f}%)")
-                tqdm.write("")  # Add blank line for readability
+                # Built once per file and shown again after each view or enhancement
+                progress_line = f"Progress: {files_completed}/{current_total} files processed ({files_completed/current_total*100:.1f}%)"
+                # Trailing blank line for readability
+                tqdm.write(progress_line + "\n")
                 
-                # Update progress bar with dynamic total
+                # Update progress bar with dynamic total; the new description is drawn with the next refresh
                 progress_bar.total = current_total
-                progress_bar.set_description(f"Processing: {file_path.name[:30]}...")
+                progress_bar.set_description(f"Processing: {file_path.name[:30]}...", refresh=False)
                 
-                # Read file content
-                content = self.read_file_content(file_path)
+                # Keep the next few notes analyzing while the user reviews this one.
+                # Queued before the (possibly blocking) read below so the requests start as early as possible.
+                self.prefetch_file_contents(files_to_process[i:i + self.prefetch_window])
+                # Once the end of the window is not queued yet, queue a block past it, so small
+                # notes in the block can share one request instead of trickling in one by one
+                window_end = min(i + analysis_lookahead, len(files_to_process))
+                if window_end > i and str(files_to_process[window_end - 1]) not in self.analysis_futures:
+                    self.queue_analyses(files_to_process[i:window_end + self.config.get("small_note_group_size", 8)])
+                
+                # Read file content (upcoming files are prefetched in the background)
+                content = self.get_file_content(file_path)
                 
                 # Analyze with Gemini
                 tqdm.write(f"Analyzing: {file_path.name}...")
@@ -2261,29 +3908,37 @@ JSON REQUIREMENTS:
                 if is_created_atomic_note:
                     tqdm.write(f"📝 Note: This is an atomic note created during this session")
                 
-                analysis = self.analyze_note_relevance(file_path, content)
+                analysis = None
+                cluster_id = self.duplicate_clusters.get(str(file_path))
+                content_hash = self.content_hash(content) if cluster_id is not None else None
+                if cluster_id in self.cluster_analyses:
+                    # Clusters only compare the start of each note, so a sibling's own local checks
+                    # (credentials, hub links, stubs) still come before the shared verdict
+                    analysis = self.get_local_analysis(file_path, content, content_hash)
+                    if analysis is None:
+                        analysis = self.get_feature_verdict(self.extract_note_features(content))
+                    if analysis is None:
+                        analysis = dict(self.cluster_analyses[cluster_id])
+                        analysis['reasoning'] = f"{analysis['reasoning']} (shared by {self.duplicate_cluster_sizes[cluster_id]} near-duplicate notes)"
+                if analysis is None:
+                    analysis = self.get_prefetched_analysis(file_path, content)
+                if analysis is None:
+                    analysis = self.analyze_note_relevance(file_path, content)
+                # Only a real AI analysis is shared; local verdicts and failed requests never reach the analysis cache
+                if (cluster_id is not None and cluster_id not in self.cluster_analyses
+                        and content_hash in self.analysis_cache):
+                    self.cluster_analyses[cluster_id] = analysis
+                self.save_analysis_cache(min_unsaved=50)
                 
                 # Check for auto-decision
                 auto_decision = self.check_auto_decision(file_path, analysis)
                 
-                if auto_decision == "auto_keep":
-                    self.kept_files.append(file_path)
-                    if is_created_atomic_note:
-                        self.atomic_notes_reviewed.append(file_path.stem)
-                    self.processed_files.add(str(file_path))
-                    self.save_progress()
-                    decision = 'keep'
-                elif auto_decision == "auto_delete":
-                    if self.delete_file(file_path):
-                        self.deleted_files.append(file_path)
-                        if is_created_atomic_note:
-                            self.atomic_notes_reviewed.append(file_path.stem)
-                    self.processed_files.add(str(file_path))
-                    self.save_progress()
-                    decision = 'delete'
+                if auto_decision is not None:
+                    decision = AUTO_DECISIONS[auto_decision]
+                    self.record_decision(file_path, decision, is_created_atomic_note)
                 else:
                     # Display results using tqdm.write
-                    self.display_analysis_with_tqdm(file_path, analysis, content)
+                    self.display_analysis(file_path, analysis, content)
                     
                     # Get user decision (loop until they make a final choice)
                     while True:
@@ -2297,14 +3952,12 @@ JSON REQUIREMENTS:
                             tqdm.write("Progress has been saved. You can continue later by running the script again.")
                             break
                         elif decision == 'view':
-                            self.display_full_content_with_tqdm(file_path, content)
+                            self.display_full_content(file_path, content)
                             # Add spacing after viewing
                             self.soft_clear_for_tqdm(3)
-                            # Show progress
-                            files_completed = processed_count + i - 1
-                            tqdm.write(f"Progress: {files_completed}/{total_files} files processed ({files_completed/total_files*100:.1f}%)")
-                            tqdm.write("")  # Add blank line for readability
-                            self.display_analysis_with_tqdm(file_path, analysis, content)
+                            # Show progress, with a blank line for readability
+                            tqdm.write(progress_line + "\n")
+                            self.display_analysis(file_path, analysis, content)
                             # Continue the loop to ask for decision again
                             continue
                         elif decision == 'enhance':
@@ -2316,11 +3969,12 @@ JSON REQUIREMENTS:
                                 self.soft_clear_for_tqdm(2)
                                 
                                 # Show the enhanced content
-                                tqdm.write(f"{Fore.GREEN}✨ Enhanced Content Preview:{Style.RESET_ALL}")
-                                tqdm.write("="*80)
-                                preview = self.format_markdown_preview(enhanced_content, 800)
-                                tqdm.write(preview)
-                                tqdm.write("="*80)
+                                tqdm.write('\n'.join([
+                                    f"{Fore.GREEN}✨ Enhanced Content Preview:{Style.RESET_ALL}",
+                                    "="*80,
+                                    self.format_markdown_preview(enhanced_content, 800),
+                                    "="*80
+                                ]))
                                 
                                 # Ask user if they want to save the enhancement
                                 if len(content) > 0:
@@ -2339,43 +3993,31 @@ JSON REQUIREMENTS:
                                         tqdm.write(f"{Fore.GREEN}✅ Note enhanced and saved!{Style.RESET_ALL}")
                                         self.enhanced_files.append(file_path)
                                         
-                                        # Re-analyze the enhanced note
-                                        tqdm.write(f"\n🔄 Re-analyzing enhanced note...")
-                                        new_analysis = self.analyze_note_relevance(file_path, enhanced_content)
+                                        # Re-analyze the enhanced note, unless the edit was too small to change the verdict
+                                        if self.is_minor_enhancement(content, enhanced_content):
+                                            tqdm.write(f"\n♻️ Enhancement changed little, keeping the previous analysis")
+                                            new_analysis = analysis
+                                        else:
+                                            tqdm.write(f"\n🔄 Re-analyzing enhanced note...")
+                                            new_analysis = self.analyze_note_relevance(file_path, enhanced_content)
                                         
                                         # Add spacing instead of clearing
                                         self.soft_clear_for_tqdm(3)
                                         
-                                        # Show progress
-                                        files_completed = processed_count + i - 1
-                                        tqdm.write(f"Progress: {files_completed}/{total_files} files processed ({files_completed/total_files*100:.1f}%)")
-                                        tqdm.write("")
-                                        
-                                        tqdm.write(f"{Fore.GREEN}🎉 ENHANCED NOTE RE-ANALYSIS:{Style.RESET_ALL}")
-                                        tqdm.write(f"📈 Score improved from {analysis['score']}/10 to {new_analysis['score']}/10 ({'+' if new_analysis['score'] > analysis['score'] else ''}{new_analysis['score'] - analysis['score']} points)")
-                                        tqdm.write("")
+                                        # Show progress and the score change (kept for repeated views)
+                                        reanalysis_header = self.format_reanalysis_header(progress_line, analysis['score'], new_analysis['score'])
+                                        tqdm.write(reanalysis_header)
                                         
                                         # Show the enhanced note analysis
-                                        self.display_analysis_with_tqdm(file_path, new_analysis, enhanced_content)
+                                        self.display_analysis(file_path, new_analysis, enhanced_content)
                                         
                                         # Check for auto-decision on enhanced note
                                         enhanced_auto_decision = self.check_auto_decision(file_path, new_analysis)
                                         
                                         if enhanced_auto_decision == "auto_keep":
-                                            self.kept_files.append(file_path)
-                                            if is_created_atomic_note:
-                                                self.atomic_notes_reviewed.append(file_path.stem)
                                             tqdm.write(f"Enhanced note auto-kept: {file_path}")
-                                            self.processed_files.add(str(file_path))
-                                            self.save_progress()
-                                            break
-                                        elif enhanced_auto_decision == "auto_delete":
-                                            if self.delete_file(file_path):
-                                                self.deleted_files.append(file_path)
-                                                if is_created_atomic_note:
-                                                    self.atomic_notes_reviewed.append(file_path.stem)
-                                            self.processed_files.add(str(file_path))
-                                            self.save_progress()
+                                        if enhanced_auto_decision is not None:
+                                            self.record_decision(file_path, AUTO_DECISIONS[enhanced_auto_decision], is_created_atomic_note)
                                             break
                                         
                                         # Ask final decision on enhanced note
@@ -2389,39 +4031,20 @@ JSON REQUIREMENTS:
                                             if enhanced_decision in ['keep', 'delete', 'skip', 'quit']:
                                                 break
                                             elif enhanced_decision == 'view':
-                                                self.display_full_content_with_tqdm(file_path, enhanced_content)
+                                                self.display_full_content(file_path, enhanced_content)
                                                 self.soft_clear_for_tqdm(3)
-                                                files_completed = processed_count + i - 1
-                                                tqdm.write(f"Progress: {files_completed}/{total_files} files processed ({files_completed/total_files*100:.1f}%)")
-                                                tqdm.write("")
-                                                tqdm.write(f"{Fore.GREEN}🎉 ENHANCED NOTE RE-ANALYSIS:{Style.RESET_ALL}")
-                                                tqdm.write(f"📈 Score improved from {analysis['score']}/10 to {new_analysis['score']}/10 ({'+' if new_analysis['score'] > analysis['score'] else ''}{new_analysis['score'] - analysis['score']} points)")
-                                                tqdm.write("")
-                                                self.display_analysis_with_tqdm(file_path, new_analysis, enhanced_content)
+                                                tqdm.write(reanalysis_header)
+                                                self.display_analysis(file_path, new_analysis, enhanced_content)
                                                 continue
                                             elif enhanced_decision == 'enhance':
                                                 tqdm.write("Note was already enhanced. Choose keep, delete, or skip.")
                                                 continue
                                                 
-                                        if enhanced_decision == 'keep':
-                                            self.kept_files.append(file_path)
-                                            if is_created_atomic_note:
-                                                self.atomic_notes_reviewed.append(file_path.stem)
-                                            tqdm.write(f"Enhanced note kept: {file_path}")
-                                        elif enhanced_decision == 'delete':
-                                            if self.delete_file(file_path):
-                                                self.deleted_files.append(file_path)
-                                                if is_created_atomic_note:
-                                                    self.atomic_notes_reviewed.append(file_path.stem)
-                                        elif enhanced_decision == 'skip':
-                                            if is_created_atomic_note:
-                                                self.atomic_notes_reviewed.append(file_path.stem)
-                                            tqdm.write(f"Enhanced note skipped: {file_path}")
+                                        if enhanced_decision in DECISION_MESSAGES:
+                                            tqdm.write(f"Enhanced note {DECISION_MESSAGES[enhanced_decision]}: {file_path}")
                                         elif enhanced_decision == 'quit':
                                             decision = 'quit'
-                                            
-                                        self.processed_files.add(str(file_path))
-                                        self.save_progress()
+                                        self.record_decision(file_path, enhanced_decision, is_created_atomic_note)
                                         break
                                     else:
                                         tqdm.write(f"{Fore.RED}❌ Failed to save enhanced note{Style.RESET_ALL}")
@@ -2431,37 +4054,17 @@ JSON REQUIREMENTS:
                                     tqdm.write("Enhancement cancelled. Original note unchanged.")
                                     # Add spacing and re-display analysis
                                     self.soft_clear_for_tqdm(3)
-                                    files_completed = processed_count + i - 1
-                                    tqdm.write(f"Progress: {files_completed}/{total_files} files processed ({files_completed/total_files*100:.1f}%)")
-                                    tqdm.write("")
-                                    self.display_analysis_with_tqdm(file_path, analysis, content)
+                                    tqdm.write(progress_line + "\n")
+                                    self.display_analysis(file_path, analysis, content)
                                     continue
                             else:
                                 tqdm.write(f"{Fore.YELLOW}⚠️ Enhancement failed or no changes made{Style.RESET_ALL}")
                                 # Continue the loop to ask for decision again
                                 continue
-                        elif decision == 'delete':
-                            if self.delete_file(file_path):
-                                self.deleted_files.append(file_path)
-                                if is_created_atomic_note:
-                                    self.atomic_notes_reviewed.append(file_path.stem)
-                            self.processed_files.add(str(file_path))
-                            self.save_progress()  # Save progress after each file
-                            break
-                        elif decision == 'keep':
-                            self.kept_files.append(file_path)
-                            if is_created_atomic_note:
-                                self.atomic_notes_reviewed.append(file_path.stem)
-                            tqdm.write(f"Kept: {file_path}")
-                            self.processed_files.add(str(file_path))
-                            self.save_progress()  # Save progress after each file
-                            break
-                        elif decision == 'skip':
-                            if is_created_atomic_note:
-                                self.atomic_notes_reviewed.append(file_path.stem)
-                            tqdm.write(f"Skipped: {file_path}")
-                            self.processed_files.add(str(file_path))
-                            self.save_progress()  # Save progress after each file
+                        elif decision in ('delete', 'keep', 'skip'):
+                            if decision in DECISION_MESSAGES:
+                                tqdm.write(f"{DECISION_MESSAGES[decision].capitalize()}: {file_path}")
+                            self.record_decision(file_path, decision, is_created_atomic_note)
                             break
                         
                 # Update progress bar
@@ -2485,29 +4088,38 @@ JSON REQUIREMENTS:
                                 break
                         
                         # Only add if not already processed and not already in queue
-                        if (str(new_note_path) not in self.processed_files and 
-                            new_note_path not in files_to_process):
+                        if (self.progress_key(new_note_path) not in self.processed_files and 
+                            new_note_path not in queued_paths):
                             files_to_process.insert(insert_pos, new_note_path)
+                            queued_paths.add(new_note_path)
                             tqdm.write(f"   📝 Added to review queue: {new_note_path.name}")
                         
                 # Break out of outer loop if user chose quit
                 if decision == 'quit':
                     break
                     
-                # Small delay to avoid API rate limits
-                time.sleep(1)
-                
         finally:
             # Close progress bar
             progress_bar.close()
             
+            # Drop any prefetched reads and analyses that will not be used
+            self.shutdown_background_work()
+            
+            # Finish queued deletions before reporting them in the summary
+            self.wait_for_pending_deletes()
+            
+            # Record the decisions made since the last periodic save
+            self.save_progress()
+            
         # Show summary and cleanup
         self.show_summary()
         self.save_session_log()
         
-        # If we completed all files, cleanup progress file
+        # If we completed all files, cleanup progress file; otherwise fold the log into it
         if decision != 'quit':
             self.cleanup_progress_file()
+        else:
+            self.save_progress(compact=True)
         
     def show_summary(self):
         """Display summary of the review session."""
@@ -2522,8 +4134,9 @@ JSON REQUIREMENTS:
         
         if self.atomic_notes_created:
             print(f"\n{Fore.MAGENTA}🔗 Atomic notes created:{Style.RESET_ALL}")
+            reviewed_titles = set(self.atomic_notes_reviewed)
             for note_title in self.atomic_notes_created:
-                if note_title in self.atomic_notes_reviewed:
+                if note_title in reviewed_titles:
                     print(f"   - {note_title}.md ✅ (also reviewed)")
                 else:
                     print(f"   - {note_title}.md")
@@ -2531,12 +4144,12 @@ JSON REQUIREMENTS:
         if self.enhanced_files:
             print(f"\n{Fore.YELLOW}✨ Enhanced files:{Style.RESET_ALL}")
             for file_path in self.enhanced_files:
-                print(f"   - {file_path.relative_to(self.vault_path)}")
+                print(f"   - {self.get_relative_path(file_path)}")
         
         if self.deleted_files:
             print(f"\n{Fore.RED}🗑️ Deleted files:{Style.RESET_ALL}")
             for file_path in self.deleted_files:
-                print(f"   - {file_path.relative_to(self.vault_path)}")
+                print(f"   - {self.get_relative_path(file_path)}")
 
     def restore_note_from_backup(self, file_path: Path, original_content: str) -> bool:
         """
@@ -2612,8 +4225,11 @@ def main():
         except ValueError:
             print("Invalid input. Using current value.")
     
-    # Start review
-    reviewer.review_vault()
+    # Start review; the rubric cache is deleted however the session ends
+    try:
+        reviewer.review_vault()
+    finally:
+        reviewer.delete_rubric_cache()
 
 
 if __name__ == "__main__":